@@ -2,7 +2,12 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django import forms
 from django.contrib.auth.hashers import make_password
+from .backends import forget_users
+from .emails import send_status_emails
 from .models import CustomUser, Player, Certificate
+from sports_base.broadcasts import send_notification
+from sports_base.exports import export_as_csv, export_as_xlsx
+from sports_base.search import IndexedSearchMixin
 
 class CustomUserAdminForm(forms.ModelForm):
     new_password = forms.CharField(label="New Password", widget=forms.PasswordInput, required=False, help_text="Leave blank to keep the current password.")
@@ -70,25 +75,38 @@ class CustomUserAdmin(UserAdmin):
     )
     search_fields = ['email', 'first_name', 'last_name', 'cnic']
     ordering = ['email']
-    actions = ['approve_users', 'decline_users']
+    actions = ['approve_users', 'decline_users', export_as_csv, export_as_xlsx]
 
     def get_coach_profile(self, obj):
         return obj.coach_profile.name if hasattr(obj, 'coach_profile') else '-'
     get_coach_profile.short_description = 'Coach Profile'
 
     def approve_users(self, request, queryset):
-        queryset.update(status='approved')
+        self._set_status(queryset, 'approved')
         self.message_user(request, "Selected users have been approved.")
 
     def decline_users(self, request, queryset):
-        queryset.update(status='declined')
+        self._set_status(queryset, 'declined')
         self.message_user(request, "Selected users have been declined.")
 
-class PlayerAdmin(admin.ModelAdmin):
+    def _set_status(self, queryset, status):
+        # Only users whose status actually changes get an email
+        changed = list(queryset.exclude(status=status).only('pk', 'email', 'username', 'first_name', 'last_name'))
+        # Taken before the update: a queryset filtered on status would match nobody afterwards
+        pks = list(queryset.values_list('pk', flat=True))
+        queryset.update(status=status, is_approved=(status == 'approved'))
+        forget_users(pks)
+        for user in changed:
+            user.status = status
+        send_status_emails(changed)
+
+class PlayerAdmin(IndexedSearchMixin, admin.ModelAdmin):
     form = PlayerAdminForm
+    search_kind = 'player'
     list_display = ['user', 'father_name', 'sport', 'college_roll_no', 'blood_group', 'disability']
     search_fields = ['user__email', 'father_name', 'college_roll_no']
-    list_filter = ['sport', 'blood_group', 'disability']
+    list_filter = ['sport', 'blood_group', 'disability', 'user__status']
+    actions = [send_notification, export_as_csv, export_as_xlsx]
 
 class CertificateAdmin(admin.ModelAdmin):
     form = CertificateAdminForm
@@ -1,18 +1,81 @@
+import logging
+import time
+
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import router
+
+from sports_base.perf import stats
 from .models import CustomUser
+from .throttling import check_login_rate
+
+logger = logging.getLogger(__name__)
+
+# Columns the login view and session setup touch; the rest stay deferred.
+AUTH_FIELDS = ('id', 'email', 'username', 'password', 'is_active', 'is_player', 'status', 'last_login')
+USER_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+# Everything request.user needs, in model order; entries are dropped on every user save
+CACHED_USER_FIELDS = [field.attname for field in CustomUser._meta.concrete_fields if field.attname != 'password']
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_users(user_ids):
+    """Drop cached users, e.g. after a queryset.update() that skipped the save signals."""
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+
 
 class EmailBackend(ModelBackend):
     def authenticate(self, request, email=None, password=None, **kwargs):
-        try:
-            user = CustomUser.objects.get(email=email)
-            if user.check_password(password) and user.is_active and user.status == 'approved':
-                return user
-            return None
-        except CustomUser.DoesNotExist:
+        # Runs first for every login (admin logins pass username=<email>), so
+        # throttling here also protects the ModelBackend fallback.
+        identifier = email or kwargs.get('username')
+        retry_after = check_login_rate(request, identifier)
+        if retry_after:
+            logger.warning(f"Login throttled for {identifier!r}; retry in {retry_after:.0f}s")
+            if request is not None:
+                request.login_retry_after = retry_after
+            # Stops Django from trying the remaining backends for this attempt
+            raise PermissionDenied
+        if email is None or password is None:
             return None
 
+        user = CustomUser.objects.only(*AUTH_FIELDS).filter(email=email).first()
+        start = time.perf_counter()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            CustomUser().set_password(password)
+            valid = False
+        else:
+            valid = user.check_password(password)
+        if getattr(settings, 'PERF_MONITORING', False):
+            stats.record('auth:check_password', wall_ms=(time.perf_counter() - start) * 1000)
+
+        if valid and user.is_active and user.status == 'approved':
+            return user
+        if valid and request is not None:
+            # Right password, so the login form may say why the account was refused
+            request.login_refused_status = user.status if user.is_active else 'inactive'
+        # ModelBackend would hash the password again and skip the status check
+        raise PermissionDenied
+
     def get_user(self, user_id):
-        try:
-            return CustomUser.objects.get(pk=user_id)
-        except CustomUser.DoesNotExist:
-            return None
\ No newline at end of file
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            row = CustomUser.objects.filter(pk=user_id).values(*CACHED_USER_FIELDS, 'password').first()
+            if row is None:
+                return None
+            # The cache keeps the session check's HMAC, never the password hash itself
+            session_hash = CustomUser(password=row['password']).get_session_auth_hash()
+            cached = ([row[name] for name in CACHED_USER_FIELDS], session_hash)
+            cache.set(key, cached, USER_CACHE_TIMEOUT)
+        values, session_hash = cached
+        # The password stays deferred: code that needs it loads it, and save() leaves it alone
+        user = CustomUser.from_db(router.db_for_read(CustomUser), CACHED_USER_FIELDS, values)
+        user._session_auth_hash = session_hash
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+
+def send_status_emails(users):
+    """Tell each user their account was approved or declined (queued in the outbox)."""
+    context = {
+        'domain': getattr(settings, 'DOMAIN', '127.0.0.1:8000'),
+        'protocol': getattr(settings, 'PROTOCOL', 'http'),
+    }
+    messages = []
+    for user in users:
+        context['user'] = user
+        subject = ''.join(render_to_string('Sports_Users/account_status_subject.txt', context).splitlines())
+        body = render_to_string('Sports_Users/account_status_email.txt', context)
+        messages.append(EmailMessage(subject, body, to=[user.email]))
+    # One backend call, so the outbox stores every message with a single INSERT
+    return get_connection().send_messages(messages)
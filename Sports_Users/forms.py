@@ -55,23 +55,7 @@ class PlayerRegistrationForm(UserCreationForm):
         if password1 and confirm_password and password1 != confirm_password:
             self.add_error('confirm_password', "Passwords do not match")
         
-        cnic = cleaned_data.get('cnic')
-        if cnic and not cnic_pattern.match(cnic):
-            self.add_error('cnic', "CNIC must be in the format 12345-1234567-1")
-        
-        father_cnic = cleaned_data.get('father_cnic')
-        if father_cnic and not cnic_pattern.match(father_cnic):
-            self.add_error('father_cnic', "Father CNIC must be in the format 12345-1234567-1")
-        
-        whatsapp_number = cleaned_data.get('whatsapp_number')
-        if whatsapp_number and not whatsapp_pattern.match(whatsapp_number.replace(' ', '')):
-            self.add_error('whatsapp_number', "WhatsApp number must be in the format +92 3000000000")
-        
-        disability = cleaned_data.get('disability')
-        disability_detail = cleaned_data.get('disability_detail')
-        if disability == 'Yes' and not disability_detail:
-            self.add_error('disability_detail', "Disability detail is required if disability is selected as Yes")
-        
+        check_player_details(self, cleaned_data)
         return cleaned_data
 
     def save(self, commit=True):
@@ -103,6 +87,33 @@ class PlayerRegistrationForm(UserCreationForm):
 cnic_pattern = re.compile(r'^\d{5}-\d{7}-\d$')
 whatsapp_pattern = re.compile(r'^\+923\d{9}$')
 
+
+def check_player_details(form, cleaned_data):
+    """CNIC, WhatsApp and disability checks shared by registration and bulk import."""
+    cnic = cleaned_data.get('cnic')
+    if cnic and not cnic_pattern.match(cnic):
+        form.add_error('cnic', "CNIC must be in the format 12345-1234567-1")
+
+    father_cnic = cleaned_data.get('father_cnic')
+    if father_cnic and not cnic_pattern.match(father_cnic):
+        form.add_error('father_cnic', "Father CNIC must be in the format 12345-1234567-1")
+
+    whatsapp_number = cleaned_data.get('whatsapp_number')
+    if whatsapp_number and not whatsapp_pattern.match(whatsapp_number.replace(' ', '')):
+        form.add_error('whatsapp_number', "WhatsApp number must be in the format +92 3000000000")
+
+    if cleaned_data.get('disability') == 'Yes' and not cleaned_data.get('disability_detail'):
+        form.add_error('disability_detail', "Disability detail is required if disability is selected as Yes")
+
+
+# Set by EmailBackend when the password was right but the account may not log in
+LOGIN_REFUSED_MESSAGES = {
+    'pending': "Your account is pending approval. Please wait for admin approval.",
+    'declined': "Your account has been declined. Please contact the admin.",
+    'inactive': "Your account is inactive. Please contact the admin.",
+}
+
+
 class PlayerLoginForm(forms.Form):
     email = forms.EmailField(
         widget=forms.EmailInput(attrs={'placeholder': 'Enter Email', 'class': 'form-control'}),
@@ -126,6 +137,13 @@ class PlayerLoginForm(forms.Form):
         password = cleaned_data.get('password')
         if email and password:
             self.user_cache = authenticate(self.request, email=email, password=password)
+            retry_after = getattr(self.request, 'login_retry_after', None)
+            if retry_after:
+                minutes = max(1, round(retry_after / 60))
+                raise forms.ValidationError(f"Too many login attempts. Please try again in {minutes} minute(s).")
+            refused = getattr(self.request, 'login_refused_status', None)
+            if refused in LOGIN_REFUSED_MESSAGES:
+                raise forms.ValidationError(LOGIN_REFUSED_MESSAGES[refused])
             if not self.user_cache:
                 raise forms.ValidationError("Invalid email or password.")
         return cleaned_data
@@ -232,4 +250,52 @@ class PlayerChangePasswordForm(forms.Form):
         if new_password and len(new_password) < 6:
             self.add_error('new_password', "New password must be at least 6 characters.")
 
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class PlayerImportForm(forms.Form):
+    """Validates one row of a bulk player import (see Sports_Users.imports)."""
+    email = forms.EmailField()
+    first_name = forms.CharField(max_length=50)
+    last_name = forms.CharField(max_length=50, required=False)
+    cnic = forms.CharField(max_length=15)
+    phone_number = forms.CharField(max_length=15, required=False)
+    password = forms.CharField(required=False)
+    status = forms.CharField(required=False)
+    father_name = forms.CharField(max_length=100)
+    father_cnic = forms.CharField(max_length=15)
+    dob = forms.DateField(input_formats=['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'])
+    whatsapp_number = forms.CharField(max_length=15)
+    province = forms.CharField(max_length=100)
+    city = forms.CharField(max_length=100)
+    address = forms.CharField()
+    sport = forms.CharField()
+    height = forms.FloatField(min_value=3.0, max_value=8.0)
+    weight = forms.FloatField(min_value=30.0, max_value=150.0)
+    college_roll_no = forms.CharField(max_length=50)
+    blood_group = forms.ChoiceField(choices=Player.BLOOD_GROUP_CHOICES)
+    disability = forms.ChoiceField(choices=Player.DISABILITY_CHOICES, required=False)
+    disability_detail = forms.CharField(required=False)
+
+    def __init__(self, *args, sports=None, **kwargs):
+        # sports: lower-cased name -> Sport, loaded once for the whole import
+        self.sports = sports or {}
+        super().__init__(*args, **kwargs)
+
+    def clean_sport(self):
+        sport = self.sports.get(self.cleaned_data['sport'].strip().lower())
+        if sport is None:
+            raise forms.ValidationError("Unknown sport")
+        return sport
+
+    def clean_status(self):
+        # Accept the value or the label ('approved' or 'Approved'), as exports write labels
+        status = self.cleaned_data['status'].strip().lower()
+        if status and status not in dict(CustomUser.STATUS_CHOICES):
+            raise forms.ValidationError("Status must be pending, approved or declined")
+        return status
+
+    def clean(self):
+        cleaned_data = super().clean()
+        check_player_details(self, cleaned_data)
+        return cleaned_data
@@ -0,0 +1,191 @@
+"""
+Bulk player import.
+
+Rows are streamed from a CSV or XLSX file and validated one by one with
+``PlayerImportForm``. Valid rows are inserted in chunks: passwords are hashed
+in a process pool, usernames are allocated once per chunk, and each chunk's
+users and players go in with two ``bulk_create`` calls inside a transaction.
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import date, datetime
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils.crypto import get_random_string
+
+from sports_base.models import Sport
+from sports_base.pagecache import invalidate_model
+from sports_base.search import index_objects
+
+from .forms import PlayerImportForm
+from .models import CustomUser, Player
+
+IMPORT_BATCH_SIZE = 500
+
+USER_FIELDS = ('email', 'first_name', 'last_name', 'cnic', 'phone_number')
+PLAYER_FIELDS = (
+    'father_name', 'father_cnic', 'dob', 'whatsapp_number', 'province', 'city', 'address',
+    'sport', 'height', 'weight', 'college_roll_no', 'blood_group', 'disability', 'disability_detail',
+)
+
+
+def _column_name(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        columns = [_column_name(header) for header in next(reader, [])]
+        for number, values in enumerate(reader, start=2):
+            if any(value.strip() for value in values):
+                yield number, dict(zip(columns, (value.strip() for value in values)))
+
+
+def read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Reading .xlsx files needs openpyxl (pip install openpyxl)") from e
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = [_column_name(header) for header in next(rows, ())]
+        for number, values in enumerate(rows, start=2):
+            values = [_cell_text(value) for value in values]
+            if any(values):
+                yield number, dict(zip(columns, values))
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    """Yield ``(row number, {column: text})`` pairs from a CSV or XLSX file."""
+    if path.lower().endswith('.xlsx'):
+        return read_xlsx(path)
+    return read_csv(path)
+
+
+def _init_hasher():
+    django.setup()
+
+
+class PlayerImporter:
+    """
+    Validate and insert player rows; collects ``(row, field, message)`` errors.
+
+    With ``dry_run`` every check runs (including duplicates against the
+    database and earlier rows) but nothing is hashed or written.
+    """
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, processes=None, dry_run=False, status='pending'):
+        self.batch_size = batch_size
+        self.processes = processes or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.status = status
+        self.created = 0
+        self.errors = []
+        self._emails = set()
+        self._cnics = set()
+        self._pool = None
+
+    def run(self, rows):
+        sports = {sport.name.strip().lower(): sport for sport in Sport.objects.all()}
+        pool = nullcontext() if self.dry_run else ProcessPoolExecutor(self.processes, initializer=_init_hasher)
+        with pool as self._pool:
+            chunk = []
+            for number, row in rows:
+                form = PlayerImportForm(row, sports=sports)
+                if not form.is_valid():
+                    for field, messages in form.errors.items():
+                        self.errors.append((number, field, ' '.join(messages)))
+                    continue
+                data = form.cleaned_data
+                data['email'] = CustomUser.objects.normalize_email(data['email'])
+                chunk.append((number, data))
+                if len(chunk) >= self.batch_size:
+                    self._insert(chunk)
+                    chunk = []
+            if chunk:
+                self._insert(chunk)
+        if self.created:
+            invalidate_model(Player)
+        return self
+
+    def _drop_duplicates(self, chunk):
+        emails = [data['email'] for _, data in chunk]
+        cnics = [data['cnic'] for _, data in chunk]
+        existing_emails = set(CustomUser.objects.filter(email__in=emails).values_list('email', flat=True))
+        existing_cnics = set(CustomUser.objects.filter(cnic__in=cnics).values_list('cnic', flat=True))
+        accepted = []
+        for number, data in chunk:
+            if data['email'] in existing_emails or data['email'] in self._emails:
+                self.errors.append((number, 'email', "A user with this email already exists."))
+            elif data['cnic'] in existing_cnics or data['cnic'] in self._cnics:
+                self.errors.append((number, 'cnic', "A user with this CNIC already exists."))
+            else:
+                self._emails.add(data['email'])
+                self._cnics.add(data['cnic'])
+                accepted.append((number, data))
+        return accepted
+
+    def _build(self, data, password, username=''):
+        status = data['status'] or self.status
+        user = CustomUser(
+            username=username, password=password, is_player=True,
+            status=status, is_approved=(status == 'approved'),
+            **{field: data[field] for field in USER_FIELDS},
+        )
+        player = Player(user=user, **{field: data[field] for field in PLAYER_FIELDS})
+        return user, player
+
+    def _insert(self, chunk):
+        chunk = self._drop_duplicates(chunk)
+        if not chunk or self.dry_run:
+            self.created += len(chunk)
+            return
+        passwords = [data['password'] or get_random_string(16) for _, data in chunk]
+        chunksize = max(1, len(passwords) // (self.processes * 4))
+        hashes = list(self._pool.map(make_password, passwords, chunksize=chunksize))
+        usernames = CustomUser.objects.allocate_usernames([data['email'] for _, data in chunk])
+
+        built = [self._build(data, password, username)
+                 for (_, data), password, username in zip(chunk, hashes, usernames)]
+        try:
+            with transaction.atomic():
+                CustomUser.objects.bulk_create([user for user, _ in built])
+                for user, player in built:
+                    player.user = user  # picks up the primary key assigned by bulk_create
+                Player.objects.bulk_create([player for _, player in built])
+                # bulk_create sends no post_save, so index the new players here
+                index_objects('player', [user.pk for user, _ in built])
+            self.created += len(built)
+        except IntegrityError:
+            # Something raced us (or slipped past the checks); insert row by row
+            # so only the offending rows fail.
+            for (number, data), password in zip(chunk, hashes):
+                self._insert_one(number, data, password)
+
+    def _insert_one(self, number, data, password):
+        user, player = self._build(data, password)
+        try:
+            with transaction.atomic():
+                user.save()
+                player.user = user
+                player.save()
+            self.created += 1
+        except IntegrityError as e:
+            self.errors.append((number, '__all__', str(e)))
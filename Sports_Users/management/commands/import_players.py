@@ -0,0 +1,47 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Sports_Users.imports import IMPORT_BATCH_SIZE, PlayerImporter, read_rows
+from Sports_Users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Register players in bulk from a CSV or XLSX file (one player per row, headers in the first row)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file. Columns match the registration form; 'sport' is the sport name.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate every row without creating anything.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Rows inserted per transaction.")
+        parser.add_argument('--processes', type=int, default=None, help="Password hashing processes (default: CPU count).")
+        parser.add_argument(
+            '--status', choices=[choice for choice, _ in CustomUser.STATUS_CHOICES], default='pending',
+            help="Account status for rows without a 'status' column.",
+        )
+        parser.add_argument('--report', help="Write the per-row errors to this CSV file.")
+
+    def handle(self, *args, **options):
+        importer = PlayerImporter(
+            batch_size=max(1, options['batch_size']),
+            processes=options['processes'],
+            dry_run=options['dry_run'],
+            status=options['status'],
+        )
+        try:
+            importer.run(read_rows(options['path']))
+        except (OSError, ImportError) as e:
+            raise CommandError(str(e))
+
+        for number, field, message in importer.errors[:20]:
+            self.stderr.write(f"Row {number}: {field}: {message}")
+        if len(importer.errors) > 20:
+            self.stderr.write(f"... and {len(importer.errors) - 20} more error(s)")
+        if options['report']:
+            with open(options['report'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['row', 'field', 'error'])
+                writer.writerows(importer.errors)
+
+        verb = "Would create" if options['dry_run'] else "Created"
+        rows_failed = len({number for number, _, _ in importer.errors})
+        self.stdout.write(self.style.SUCCESS(f"{verb} {importer.created} player(s); {rows_failed} row(s) rejected."))
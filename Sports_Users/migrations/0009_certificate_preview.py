@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0008_alter_customuser_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='certificates/previews/'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='preview_source',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 16:27
+
+import sports_base.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0009_certificate_preview'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to='profiles/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+    ]
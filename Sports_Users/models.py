@@ -1,23 +1,70 @@
+import re
+
 from django.contrib.auth.models import AbstractUser, UserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from sports_base.uploads import validate_image_upload
+
 
 def restrict_file_to_pdf(value):
     if not value.name.endswith('.pdf'):
         raise ValidationError('File must be a PDF.')
 
 
+USERNAME_ATTEMPTS = 5
+# Bases per lookup query; keeps the OR-ed LIKE clauses well under SQLite's expression limits.
+USERNAME_LOOKUP_BATCH = 200
+
+
+def username_base(email):
+    return email.split('@')[0]
+
+
 # Custom manager to avoid username requirement
 class CustomUserManager(UserManager):
+    def allocate_usernames(self, emails):
+        """
+        Return a free username for each email, in order, with one query per 200 distinct bases.
+
+        Each name is the email's local part, or the local part followed by one
+        more than the highest numeric suffix already in use (ali, ali1, ali7 ->
+        ali8). Names are unique within the batch too, so bulk imports can
+        allocate all of theirs up front. Another process may still take a name
+        before it is saved; CustomUser.save retries in that case.
+        """
+        bases = [username_base(email) for email in emails]
+        distinct = list(dict.fromkeys(bases))
+        taken = set()
+        for start in range(0, len(distinct), USERNAME_LOOKUP_BATCH):
+            query = Q()
+            for base in distinct[start:start + USERNAME_LOOKUP_BATCH]:
+                query |= Q(username__startswith=base)
+            taken.update(self.filter(query).values_list('username', flat=True))
+
+        next_suffix = {}
+        for base in distinct:
+            pattern = re.compile(re.escape(base) + r'(\d+)')
+            suffixes = [int(match.group(1)) for match in map(pattern.fullmatch, taken) if match]
+            next_suffix[base] = max(suffixes, default=0) + 1
+
+        usernames = []
+        for base in bases:
+            username = base
+            while username in taken:
+                username = f"{base}{next_suffix[base]}"
+                next_suffix[base] += 1
+            taken.add(username)
+            usernames.append(username)
+        return usernames
+
     def _create_user(self, email, password, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
         email = self.normalize_email(email)
-        # Auto-generate username from email if not provided
-        if not extra_fields.get('username'):
-            extra_fields['username'] = email.split('@')[0]
+        # Without a username, CustomUser.save allocates one from the email
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
@@ -48,7 +95,7 @@ class CustomUser(AbstractUser):
     last_name = models.CharField(max_length=50)
     cnic = models.CharField(max_length=15, unique=True, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True)
-    profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True, validators=[validate_image_upload])
     is_approved = models.BooleanField(default=False)  # Kept for backward compatibility
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
 
@@ -58,20 +105,32 @@ class CustomUser(AbstractUser):
     objects = CustomUserManager()  # Use custom manager
 
     def save(self, *args, **kwargs):
-        if not self.username:
-            base_username = self.email.split('@')[0]
-            username = base_username
-            counter = 1
-            while CustomUser.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            self.username = username
         self.is_approved = (self.status == 'approved')
-        super().save(*args, **kwargs)
+        if self.username:
+            super().save(*args, **kwargs)
+            return
+        for attempt in range(USERNAME_ATTEMPTS):
+            self.username = CustomUser.objects.allocate_usernames([self.email])[0]
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                # Another worker may have registered the same name since we looked
+                taken = CustomUser.objects.filter(username=self.username).exists()
+                self.username = ''
+                if not taken or attempt == USERNAME_ATTEMPTS - 1:
+                    raise
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def get_session_auth_hash(self):
+        # Users rebuilt by EmailBackend.get_user carry the hash instead of the password
+        if 'password' not in self.__dict__ and hasattr(self, '_session_auth_hash'):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
     @property
     def plain_password(self):
         return self.password
@@ -114,6 +173,17 @@ class Certificate(models.Model):
     certificate_file = models.FileField(upload_to='certificates/', blank=True, null=True)
     # , validators=[restrict_file_to_pdf]
     uploaded_at = models.DateTimeField(default=timezone.now)
+    # First-page thumbnail rendered from certificate_file (see Sports_Users.previews)
+    preview = models.ImageField(upload_to='certificates/previews/', blank=True, null=True, editable=False)
+    preview_source = models.CharField(max_length=255, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Drop a preview rendered from a file that has since been replaced
+        if self.preview and self.preview_source != (self.certificate_file.name or ''):
+            self.preview.delete(save=False)
+            self.preview_source = ''
+            Certificate.objects.filter(pk=self.pk).update(preview=None, preview_source='')
 
     def __str__(self):
         return f"{self.title} - {self.player.user.first_name} {self.player.user.last_name}"
@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, features
+
+from pdf2image import convert_from_path
+from sports_base.jobs import enqueue
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of the rendered preview, in pixels.
+PREVIEW_MAX_SIZE = getattr(settings, 'CERTIFICATE_PREVIEW_MAX_SIZE', 1400)
+PREVIEW_FORMAT = 'WEBP' if features.check('webp') else 'PNG'
+
+
+def preview_name_for(cert):
+    """Build a stable preview name that changes whenever the source file changes."""
+    digest = hashlib.sha1(cert.certificate_file.name.encode('utf-8')).hexdigest()[:12]
+    return f"{cert.pk}-{digest}.{PREVIEW_FORMAT.lower()}"
+
+
+def _rasterize(cert):
+    """Return a PIL image of the certificate's first page."""
+    file_path = cert.certificate_file.path
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.pdf':
+        images = convert_from_path(
+            file_path,
+            first_page=1,
+            last_page=1,
+            size=(PREVIEW_MAX_SIZE, None),
+            poppler_path=getattr(settings, 'POPPLER_PATH', None),
+        )
+        return images[0]
+    image = Image.open(file_path)
+    image.load()
+    return image
+
+
+def _record_failure(cert):
+    """Mark the current file as tried, with no preview, so views stop asking for it."""
+    if cert.preview:
+        cert.preview.delete(save=False)
+    cert.preview_source = cert.certificate_file.name
+    type(cert).objects.filter(pk=cert.pk).update(preview=None, preview_source=cert.preview_source)
+
+
+def render_certificate_preview(cert):
+    """
+    Render the first page of a certificate into its ``preview`` field.
+
+    Returns True when a preview was written, False when the certificate has no
+    file or the file could not be rasterized. A failure is recorded on the
+    certificate; the ``certificate_preview`` job retries it.
+    """
+    if not cert.certificate_file:
+        return False
+    try:
+        image = _rasterize(cert)
+    except Exception as e:
+        logger.error(f"Certificate preview error for certificate {cert.pk}: {e}")
+        _record_failure(cert)
+        return False
+
+    image.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+    buf = BytesIO()
+    image.save(buf, format=PREVIEW_FORMAT, quality=85)
+
+    if cert.preview:
+        cert.preview.delete(save=False)
+    cert.preview.save(preview_name_for(cert), ContentFile(buf.getvalue()), save=False)
+    cert.preview_source = cert.certificate_file.name
+    type(cert).objects.filter(pk=cert.pk).update(
+        preview=cert.preview.name,
+        preview_source=cert.preview_source,
+    )
+    return True
+
+
+def preview_ready(cert):
+    return bool(cert.preview) and cert.preview_source == cert.certificate_file.name
+
+
+def request_certificate_preview(cert):
+    """
+    For views: queue a render when none has been tried for the current file,
+    e.g. for files uploaded before previews were queued. Never renders in the request.
+    """
+    if cert.certificate_file and cert.preview_source != cert.certificate_file.name:
+        enqueue('certificate_preview', cert, version=cert.certificate_file.name)
+        return True
+    return False
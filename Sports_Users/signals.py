@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sports_base.jobs import enqueue_on_commit
+
+from .backends import forget_users
+from .models import Certificate, CustomUser
+
+
+@receiver(post_save, sender=Certificate)
+def queue_certificate_preview(sender, instance, **kwargs):
+    """Render the preview at upload time instead of on the player's first view."""
+    if instance.certificate_file and instance.preview_source != instance.certificate_file.name:
+        enqueue_on_commit('certificate_preview', instance, version=instance.certificate_file.name)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
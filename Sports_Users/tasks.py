@@ -0,0 +1,13 @@
+from sports_base.jobs import get_job_object, job_handler
+
+from .previews import preview_ready, render_certificate_preview
+
+
+@job_handler('certificate_preview')
+def render_certificate_preview_job(job):
+    cert = get_job_object(job)
+    if cert is None or not cert.certificate_file:
+        return
+    # A failure recorded by an earlier attempt is rendered again; raising schedules the next retry
+    if not preview_ready(cert) and not render_certificate_preview(cert):
+        raise RuntimeError(f"Could not render a preview for certificate {cert.pk}")
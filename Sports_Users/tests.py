@@ -1,3 +1,115 @@
-from django.test import TestCase
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from sports_base.models import Notification, Sport
+from static_pages.tests import FAST_HASHERS, TEST_STORAGES, make_player, make_teams
+from .backends import EmailBackend, user_cache_key
+from .throttling import LOGIN_RATE_LIMITS
+
+
+@override_settings(STORAGES=TEST_STORAGES, PASSWORD_HASHERS=FAST_HASHERS)
+class PlayerDashboardQueryCountTests(TestCase):
+    """The dashboard must not issue queries per teammate."""
+
+    # Session, player, team, roster, achievements, certificates, notifications;
+    # the user itself comes from EmailBackend's cache after the first request.
+    QUERIES = 7
+
+    def setUp(self):
+        cache.clear()
+        self.sport = Sport.objects.create(name='Cricket')
+        self.player = make_player('me@example.com', self.sport)
+        Notification.objects.create(title='Practice', recipient=self.player.user)
+        self.client.force_login(self.player.user)
+        self.client.get(reverse('Sports_Users:player_dashboard'))
+
+    def test_query_count_is_constant(self):
+        url = reverse('Sports_Users:player_dashboard')
+        make_teams(self.sport, 1, 2)
+        self.sport.teams.get().players.add(self.player)
+        with self.assertNumQueries(self.QUERIES):
+            self.client.get(url)
+
+        make_teams(self.sport, 1, 12)
+        self.sport.teams.latest('created_at').players.add(self.player)
+        with self.assertNumQueries(self.QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['teammates']), 12)
+
+
+class CountingHasher(MD5PasswordHasher):
+    calls = 0
+
+    def encode(self, password, salt):
+        CountingHasher.calls += 1
+        return super().encode(password, salt)
+
+
+@override_settings(STORAGES=TEST_STORAGES, PASSWORD_HASHERS=['Sports_Users.tests.CountingHasher'])
+class EmailBackendTests(TestCase):
+    """A login attempt hashes the password at most once and honours the approval status."""
+
+    def setUp(self):
+        cache.clear()
+        self.player = make_player('me@example.com', Sport.objects.create(name='Cricket'))
+        self.request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+        CountingHasher.calls = 0
+
+    def test_failed_login_hashes_once(self):
+        self.assertIsNone(authenticate(self.request, email='me@example.com', password='wrong'))
+        self.assertEqual(CountingHasher.calls, 1)
+
+    def test_unapproved_user_is_not_let_in_by_the_fallback(self):
+        self.player.user.status = 'pending'
+        self.player.user.save()
+        self.assertIsNone(authenticate(self.request, email='me@example.com', password='pass12345'))
+        self.assertEqual(CountingHasher.calls, 1)
+
+    def test_login_form_reports_pending_account(self):
+        self.player.user.status = 'pending'
+        self.player.user.save()
+        response = self.client.post(
+            reverse('Sports_Users:player_login'), {'email': 'me@example.com', 'password': 'pass12345'}, follow=True,
+        )
+        self.assertContains(response, 'pending approval')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_email_limit_rejects_before_hashing(self):
+        limit = LOGIN_RATE_LIMITS['email'][0]
+        for _ in range(limit):
+            authenticate(self.request, email='me@example.com', password='wrong')
+        self.assertEqual(CountingHasher.calls, limit)
+        self.assertIsNone(authenticate(self.request, email='me@example.com', password='pass12345'))
+        self.assertEqual(CountingHasher.calls, limit)
+        self.assertTrue(self.request.login_retry_after)
+
+    def test_ip_limit_rejects_before_hashing(self):
+        limit = LOGIN_RATE_LIMITS['ip'][0]
+        for i in range(limit):
+            authenticate(self.request, email=f'guess{i}@example.com', password='wrong')
+        self.assertEqual(CountingHasher.calls, limit)
+        # Neither EmailBackend nor the ModelBackend after it hashes a throttled attempt
+        self.assertIsNone(authenticate(self.request, email='me@example.com', password='pass12345'))
+        self.assertIsNone(authenticate(self.request, username='me@example.com', password='pass12345'))
+        self.assertEqual(CountingHasher.calls, limit)
+
+    def test_cached_user_is_dropped_on_save(self):
+        user = self.player.user
+        EmailBackend().get_user(user.pk)
+        self.assertIsNotNone(cache.get(user_cache_key(user.pk)))
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertIsNone(cache.get(user_cache_key(user.pk)))
+        self.assertEqual(EmailBackend().get_user(user.pk).first_name, 'Renamed')
+
+    def test_cache_never_holds_the_password_hash(self):
+        user = self.player.user
+        cached_user = EmailBackend().get_user(user.pk)
+        values, session_hash = cache.get(user_cache_key(user.pk))
+        self.assertNotIn(user.password, values)
+        self.assertNotEqual(session_hash, user.password)
+        self.assertNotIn('password', cached_user.__dict__)
+        self.assertEqual(cached_user.get_session_auth_hash(), user.get_session_auth_hash())
@@ -0,0 +1,79 @@
+"""
+Login throttling.
+
+Every login attempt counts against two limits kept in the default cache:
+one for the client IP and one for the email being tried. Each limit is a
+sliding window: the attempts in the current window plus the previous
+window's, weighted by how much of it still overlaps. Counters only change
+through ``cache.add``/``cache.incr``/``cache.decr``, so concurrent attempts
+cannot slip past a limit. A rejected attempt is refused before any password
+is hashed and is not counted. The cache must be shared between workers (see
+CACHE_BACKEND) for the limits to hold across processes.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# scope -> (attempts allowed, window in seconds)
+LOGIN_RATE_LIMITS = getattr(settings, 'LOGIN_RATE_LIMITS', {
+    'ip': (20, 60),
+    'email': (5, 300),
+})
+# The platform router in front of the Procfile processes appends one X-Forwarded-For entry
+TRUSTED_PROXY_COUNT = getattr(settings, 'TRUSTED_PROXY_COUNT', 1)
+
+
+def client_ip(request):
+    """The client address, skipping the ``TRUSTED_PROXY_COUNT`` proxies in front of us."""
+    if TRUSTED_PROXY_COUNT:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_COUNT:
+            return forwarded[-TRUSTED_PROXY_COUNT]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _window_key(scope, ident, window):
+    return f"login:window:{scope}:{hashlib.md5(ident.encode('utf-8')).hexdigest()}:{window}"
+
+
+def _increment(key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def take_token(scope, ident):
+    """Count an attempt by ``ident`` in ``scope``; return seconds to wait, 0 if allowed."""
+    limit, period = LOGIN_RATE_LIMITS[scope]
+    window, offset = divmod(time.time(), period)
+    key = _window_key(scope, ident, int(window))
+    count = _increment(key, period * 2)
+    previous = cache.get(_window_key(scope, ident, int(window) - 1), 0)
+    overlap = 1 - offset / period
+    if count + previous * overlap <= limit:
+        return 0
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+    if count > limit:
+        return period - offset
+    # Wait until enough of the previous window has slid out
+    return max(1.0, period * (1 - (limit - count) / previous) - offset)
+
+
+def check_login_rate(request, identifier):
+    """Return seconds until ``request`` may try to log in as ``identifier`` again (0 if it may now)."""
+    if request is not None:
+        retry_after = take_token('ip', client_ip(request))
+        if retry_after:
+            return retry_after
+    if identifier:
+        return take_token('email', identifier.strip().lower())
+    return 0
@@ -17,6 +17,8 @@ urlpatterns = [
 
     # Certificates
     path('certificate/<int:certificate_id>/', views.certificate_view, name='certificate_view'),
+    path('certificate/<int:certificate_id>/file/', views.certificate_file, name='certificate_file'),
+    path('certificate/<int:certificate_id>/preview/', views.certificate_preview, name='certificate_preview'),
     path('certificate/<int:certificate_id>/download/', views.download_certificate, name='download_certificate'),
 
     # Password reset (send email)
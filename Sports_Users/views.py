@@ -1,20 +1,17 @@
 import os
-import base64
-from io import BytesIO
 import logging
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import FileResponse
-from django.urls import reverse_lazy
+from django.http import Http404
+from django.urls import reverse, reverse_lazy
 from django.conf import settings
+from django.utils.text import slugify
 
 from django.contrib.auth import views as auth_views
 
-from pdf2image import convert_from_path
-
 from .forms import (
     PlayerRegistrationForm,
     PlayerLoginForm,
@@ -22,7 +19,11 @@ from .forms import (
     PlayerChangePasswordForm
 )
 from .models import Player, CustomUser, Certificate
-from sports_base.models import Notification, Team
+from .previews import preview_ready, request_certificate_preview
+from sports_base.inbox import inbox_page
+from sports_base.media import serve_media
+from sports_base.models import Team
+from sports_base.querysets import teams_with_roster
 
 logger = logging.getLogger(__name__)
 
@@ -59,16 +60,10 @@ def player_login(request):
                 if not user.is_player:
                     messages.error(request, 'Only players can log in here. Admins and coaches, please use the admin login.')
                     return redirect('/admin/login/')
-                if user.status == 'approved' and user.is_active:
-                    login(request, user)
-                    messages.success(request, 'Login successful!')
-                    return redirect('Sports_Users:player_dashboard')
-                elif user.status == 'pending':
-                    messages.error(request, 'Your account is pending approval. Please wait for admin approval.')
-                elif user.status == 'declined':
-                    messages.error(request, 'Your account has been declined. Please contact the admin.')
-                else:
-                    messages.error(request, 'Your account is inactive. Please contact the admin.')
+                # EmailBackend only returns approved, active users; the form reports the others
+                login(request, user)
+                messages.success(request, 'Login successful!')
+                return redirect('Sports_Users:player_dashboard')
             else:
                 messages.error(request, 'Invalid login credentials.')
         else:
@@ -85,19 +80,17 @@ def player_login(request):
 def player_dashboard(request):
     """Player dashboard with notifications, team info, and certificates."""
     try:
-        player = Player.objects.get(user=request.user)
+        player = Player.objects.select_related('user', 'sport').get(user=request.user)
     except Player.DoesNotExist:
         messages.error(request, 'Player profile not found.')
         return redirect('Sports_Users:player_login')
 
-    notifications = Notification.objects.filter(
-        recipient=request.user, is_general=False
-    ).order_by('-created_at')
+    notifications = inbox_page(request.user, per_page=5)
 
     certificates = Certificate.objects.filter(player=player).order_by('-uploaded_at')
 
-    team = player.teams.order_by('-created_at').first()
-    teammates = team.players.exclude(user=request.user) if team else []
+    team = teams_with_roster(player.teams.order_by('-created_at')).first()
+    teammates = [member for member in team.players.all() if member.pk != player.pk] if team else []
 
     context = {
         'player': player,
@@ -207,47 +200,62 @@ def change_password(request):
 
 # ---------------------- Certificates ----------------------
 
+def _own_certificate(request, certificate_id):
+    return get_object_or_404(Certificate, id=certificate_id, player__user=request.user)
+
+
 @login_required
 def certificate_view(request, certificate_id):
     """Preview a certificate (image or PDF first page)."""
-    cert = get_object_or_404(Certificate, id=certificate_id, player__user=request.user)
-    file_path = cert.certificate_file.path
-    file_url = cert.certificate_file.url
-    ext = os.path.splitext(file_path)[1].lower()
+    cert = _own_certificate(request, certificate_id)
+    file_url = reverse('Sports_Users:certificate_file', args=[cert.id]) if cert.certificate_file else None
 
     cert_image_url = None
-    if ext == ".pdf":
-        try:
-            images = convert_from_path(
-                file_path,
-                first_page=1,
-                last_page=1,
-                poppler_path=settings.POPPLER_PATH
-            )
-            buf = BytesIO()
-            images[0].save(buf, format="PNG")
-            buf.seek(0)
-            cert_image_url = "data:image/png;base64," + base64.b64encode(buf.read()).decode("utf-8")
-        except Exception as e:
-            logger.error(f"PDF Conversion Error: {e}")
-            cert_image_url = None
-    else:
-        cert_image_url = file_url
+    preview_pending = False
+    if file_url and preview_ready(cert):
+        cert_image_url = reverse('Sports_Users:certificate_preview', args=[cert.id])
+    elif file_url:
+        preview_pending = request_certificate_preview(cert)
+        if not cert.certificate_file.name.lower().endswith('.pdf'):
+            cert_image_url = file_url
 
     return render(request, "Sports_Users/certificate_view.html", {
         "certificate": cert,
         "cert_image_url": cert_image_url,
+        "preview_pending": preview_pending,
         "file_url": file_url,
+        "cert_file_url": reverse('Sports_Users:download_certificate', args=[cert.id]) if file_url else None,
     })
 
 
+@login_required
+def certificate_file(request, certificate_id):
+    """The certificate file itself, shown inline."""
+    cert = _own_certificate(request, certificate_id)
+    if not cert.certificate_file:
+        raise Http404('No certificate file.')
+    return serve_media(request, cert.certificate_file.name, private=True)
+
+
+@login_required
+def certificate_preview(request, certificate_id):
+    """The rendered preview image of a certificate."""
+    cert = _own_certificate(request, certificate_id)
+    if not cert.preview:
+        raise Http404('No certificate preview.')
+    return serve_media(request, cert.preview.name, private=True)
+
+
 @login_required
 def download_certificate(request, certificate_id):
     """Download certificate file."""
-    cert = get_object_or_404(Certificate, id=certificate_id, player__user=request.user)
-    file_path = cert.certificate_file.path
-    file_name = os.path.basename(file_path)
-    return FileResponse(open(file_path, "rb"), as_attachment=True, filename=file_name)
+    cert = _own_certificate(request, certificate_id)
+    if not cert.certificate_file:
+        raise Http404('No certificate file.')
+    name = cert.certificate_file.name
+    # Stored names are content hashes; offer the certificate's title instead
+    filename = f"{slugify(cert.title) or 'certificate'}{os.path.splitext(name)[1]}"
+    return serve_media(request, name, private=True, as_attachment=True, filename=filename)
 
 
 # ---------------------- Password Reset (fixed) ----------------------
@@ -32,6 +32,7 @@ X_FRAME_OPTIONS = "SAMEORIGIN"
 SILENCED_SYSTEM_CHECKS = ["security.W019"]
 
 MIDDLEWARE = [
+    'sports_base.middleware.PerformanceMiddleware',  # only active with PERF_MONITORING
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +56,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'sports_base.context_processors.inbox',
             ],
         },
     },
@@ -62,11 +64,82 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'giccl_sports_portal.wsgi.application'
 
-DATABASES = {
-    'default': {
+# Cache backend: "locmem" (single process only), "file" or "redis" (any
+# Redis-compatible server works). Shared by the page cache in
+# sports_base.pagecache.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Database profile: "sqlite" (default; fine for one web process and light
+# writes) or "postgres" (psycopg 3 with its pool, from requirements.txt).
+# "manage.py dbbenchmark <scratch db>" measures concurrent write throughput of either.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # ms a writer waits for the lock
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))
+# Connections per gunicorn worker; keep workers * DB_POOL_SIZE below the server's max_connections.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+DATABASE_PROFILES = {
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',  # Keep in root
-    }
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),  # Keep in root
+        # Reuse connections so the PRAGMAs below run once per worker, not per request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent
+            # writers queue on busy_timeout instead of failing with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT};'
+                f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'giccl_sports'),
+        'USER': os.environ.get('POSTGRES_USER', 'giccl'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Persistent connections and a connection pool are mutually exclusive
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': 5,
+            **({'pool': {
+                'min_size': max(1, DB_POOL_SIZE // 2),
+                'max_size': DB_POOL_SIZE,
+                'timeout': 10,
+            }} if DB_POOL_SIZE else {}),
+        },
+    },
+}
+DATABASES = {
+    'default': DATABASE_PROFILES[DATABASE_PROFILE],
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -84,10 +157,22 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    # Uploads are stored once per content, named by SHA-256 (sports_base.storage)
+    'default': {'BACKEND': 'sports_base.storage.HashedMediaStorage'},
+    # Django's default: manifest storage would fail on {% static %} references to missing files
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Media transfer (sports_base.media): 'python' streams files from the worker; 'nginx'
+# (X-Accel-Redirect to MEDIA_ACCEL_PREFIX, an internal location aliasing MEDIA_ROOT) and
+# 'apache' (X-Sendfile) hand them to the front server once Django has authorized the request.
+MEDIA_SERVER = os.environ.get('MEDIA_SERVER', 'python')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# Never served from MEDIA_URL; only through views that check ownership
+PROTECTED_MEDIA_PREFIXES = ['certificates/']
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -96,6 +181,14 @@ AUTHENTICATION_BACKENDS = [
     'Sports_Users.backends.EmailBackend',
     'django.contrib.auth.backends.ModelBackend',
 ]
+# Login throttling (Sports_Users.throttling): scope -> (attempts, window in seconds)
+LOGIN_RATE_LIMITS = {
+    'ip': (20, 60),
+    'email': (5, 300),
+}
+# Reverse proxies that append to X-Forwarded-For: 1 for the platform router (0: use REMOTE_ADDR)
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 1))
+AUTH_USER_CACHE_TIMEOUT = 60
 
 PWA_APP_NAME = 'GIGCCL Sports Portal'
 PWA_APP_DESCRIPTION = "This is the Officially Sports Website for Islamia Government Graduate College, Civil Lines"
@@ -139,11 +232,20 @@ PWA_APP_SCREENSHOTS = [
     {'src': '/static/images/screenshots/mobile_home.png', 'sizes': '750x1334', 'type': 'image/png', 'form_factor': 'narrow'},
 ]
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
-EMAIL_HOST_USER = "gigccl.sspe@gmail.com"
+# Mail is queued in the outbox (sports_base.mail) and delivered by `manage.py send_outbox`
+# through OUTBOX_DELIVERY_BACKEND. For local testing use the file backend, or point
+# EMAIL_HOST/EMAIL_PORT at an SMTP stand-in (python -m aiosmtpd -n -l localhost:1025).
+EMAIL_BACKEND = "sports_base.mail.OutboxBackend"
+OUTBOX_DELIVERY_BACKEND = os.environ.get('EMAIL_DELIVERY_BACKEND', "django.core.mail.backends.smtp.EmailBackend")
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_RETRY_BACKOFF = 60
+OUTBOX_MAX_ATTEMPTS = 6
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', "smtp.gmail.com")
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_TIMEOUT = 20
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "gigccl.sspe@gmail.com")
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', 'dbro evez isbd bbzo')
 DEFAULT_FROM_EMAIL = "gigccl.sspe@gmail.com"
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
@@ -152,4 +254,22 @@ PROTOCOL = os.environ.get('PROTOCOL', 'https')
 DOMAIN = os.environ.get('DOMAIN', '127.0.0.1:8000')
 PASSWORD_RESET_TIMEOUT = 3600
 
-POPPLER_PATH = r"C:\poppler\Library\bin"
\ No newline at end of file
+POPPLER_PATH = r"C:\poppler\Library\bin"
+
+# Background jobs (sports_base.jobs, run with `manage.py jobworker`)
+JOB_WORKER_PROCESSES = int(os.environ.get('JOB_WORKER_PROCESSES', 2))
+JOB_WORKER_POLL_INTERVAL = 2.0
+JOB_RETRY_BACKOFF = 30
+# Live scoreboard (sports_base.live). Enable SSE when serving through ASGI.
+LIVE_SCORES_POLL_INTERVAL = 2.0
+# Each process stops polling after this many seconds without a scoreboard request
+LIVE_SCORES_IDLE_TIMEOUT = 60.0
+LIVE_SCORES_USE_SSE = os.environ.get('LIVE_SCORES_USE_SSE', '') == '1'
+# Per-view timing and query counts (sports_base.middleware, `manage.py perfreport`)
+PERF_MONITORING = os.environ.get('PERF_MONITORING', '') == '1'
+PERF_DEFAULT_QUERY_BUDGET = None
+PERF_QUERY_BUDGETS = {
+    'static_pages:teams': 8,
+    'static_pages:scoreboard': 8,
+    'Sports_Users:player_dashboard': 10,
+}
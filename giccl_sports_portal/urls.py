@@ -1,18 +1,21 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
-from django.views.generic import TemplateView
+from sports_base.admin import perf_report_view
+from sports_base.media import public_media
+from sports_base.serviceworker import offline, service_worker
 
 urlpatterns = [
+    path('admin/perf/', admin.site.admin_view(perf_report_view), name='perf_report'),
     path('admin/', admin.site.urls),
     path('Sports_Users/', include('Sports_Users.urls', namespace='Sports_Users')),
     path('sports_base/', include('sports_base.urls', namespace='sports_base')),
+    path('api/v1/', include('sports_base.api_urls', namespace='api')),
     path('', include('static_pages.urls', namespace='static_pages')),
     path('i18n/', include('django.conf.urls.i18n')),
+    # Ahead of django-pwa, which still serves manifest.json
+    path('serviceworker.js', service_worker, name='serviceworker'),
+    path('offline/', offline, name='offline'),
     path('', include('pwa.urls')),
-    # Explicit PWA routes to avoid conflicts
-    path('serviceworker.js', TemplateView.as_view(template_name='serviceworker.js', content_type='application/javascript'), name='serviceworker'),
-    path('manifest.json', TemplateView.as_view(template_name='manifest.json', content_type='application/json'), name='manifest'),
-    path('offline/', TemplateView.as_view(template_name='static_pages/offline.html'), name='offline'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", public_media, name='media'),
+]
\ No newline at end of file
@@ -1,8 +1,15 @@
 from django import forms
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.admin.widgets import FilteredSelectMultiple
-from .models import Sport, Team, MatchResult, Event, Notification, SportSchedule, SportGallery, Feedback, Coach
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from .models import Sport, Team, MatchResult, Event, Notification, NotificationBroadcast, SportSchedule, SportGallery, Feedback, Coach, Job, Standing, OutboxEmail, MediaBlob
 from Sports_Users.models import CustomUser, Player
+from .broadcasts import deliver, describe_target, send_notification, target_players
+from .exports import export_as_csv, export_as_xlsx
+from .perf import merged_report, reset_report, stats
+from .search import IndexedSearchMixin
 
 class NotificationAdminForm(forms.ModelForm):
     class Meta:
@@ -13,6 +20,21 @@ class NotificationAdminForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['recipient'].queryset = CustomUser.objects.filter(is_player=True)
 
+class NotificationBroadcastAdminForm(forms.ModelForm):
+    sport = forms.ModelChoiceField(queryset=Sport.objects.all(), required=False)
+    team = forms.ModelChoiceField(queryset=Team.objects.select_related('sport'), required=False)
+    status = forms.ChoiceField(choices=[('', 'Any status')] + list(CustomUser.STATUS_CHOICES), required=False)
+
+    class Meta:
+        model = NotificationBroadcast
+        fields = ['title', 'message']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not any(cleaned_data.get(field) for field in ('sport', 'team', 'status')):
+            raise forms.ValidationError("Choose a sport, team or status; use a general notification to reach everyone.")
+        return cleaned_data
+
 class TeamAdminForm(forms.ModelForm):
     class Meta:
         model = Team
@@ -137,39 +159,92 @@ class MatchResultAdminForm(forms.ModelForm):
 class SportAdmin(admin.ModelAdmin):
     list_display = ['name']
     search_fields = ['name']
+    actions = [send_notification]
 
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(IndexedSearchMixin, admin.ModelAdmin):
     form = TeamAdminForm
+    search_kind = 'team'
     list_display = ['name', 'sport', 'coach']
     list_filter = ['sport']
     search_fields = ['name']
     filter_horizontal = ['players']  # Keep players as filter_horizontal for multi-select
+    actions = [send_notification, export_as_csv, export_as_xlsx]
 
 @admin.register(MatchResult)
 class MatchAdmin(admin.ModelAdmin):
     form = MatchResultAdminForm
     list_display = ['sport', 'get_participants', 'date', 'status']
     list_filter = ['sport', 'status', 'date']
-    search_fields = ['sport__name', 'team1__name', 'team2__name', 'player1__user__email', 'player2__user__email']
+    # The denormalized participant names avoid joining teams and players for every search
+    search_fields = ['sport__name', 'participant1_name', 'participant2_name', 'location']
     list_per_page = 25
+    list_select_related = ['sport']
+    actions = [export_as_csv, export_as_xlsx]
 
     def get_participants(self, obj):
         return obj.get_participants_display()
     get_participants.short_description = 'Participants'
 
+@admin.register(Standing)
+class StandingAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'played', 'won', 'drawn', 'lost', 'points']
+    list_filter = ['sport', 'season']
+    list_select_related = ['sport', 'team', 'player__user']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = 'event'
     list_display = ['title', 'date', 'location']
     list_filter = ['date']
     search_fields = ['title', 'location']
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(IndexedSearchMixin, admin.ModelAdmin):
     form = NotificationAdminForm
+    search_kind = 'notification'
     list_display = ['title', 'created_at', 'is_general', 'recipient']
     list_filter = ['is_general', 'created_at']
     search_fields = ['title', 'message', 'recipient__email']
+    list_select_related = ['recipient']
+
+@admin.register(NotificationBroadcast)
+class NotificationBroadcastAdmin(admin.ModelAdmin):
+    """Targeted notifications; adding one sends it to every matching player."""
+    form = NotificationBroadcastAdminForm
+    list_display = ['title', 'target', 'recipient_count', 'sent_by', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['title', 'message', 'target']
+    list_select_related = ['sent_by']
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return ['title', 'message', 'sport', 'team', 'status']
+        return ['title', 'message', 'target', 'recipient_count', 'sent_by', 'created_at']
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.get_fields(request, obj) if obj else []
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        criteria = {field: form.cleaned_data.get(field) or None for field in ('sport', 'team', 'status')}
+        obj.target = describe_target(**criteria)
+        obj.sent_by = request.user
+        deliver(obj, target_players(**criteria))
+
+    def response_add(self, request, obj, post_url_continue=None):
+        self.message_user(request, f"Notification sent to {obj.recipient_count} player(s).", messages.SUCCESS)
+        if '_addanother' in request.POST:
+            return redirect('admin:sports_base_notificationbroadcast_add')
+        return redirect('admin:sports_base_notificationbroadcast_changelist')
 
 @admin.register(SportSchedule)
 class SportScheduleAdmin(admin.ModelAdmin):
@@ -178,7 +253,8 @@ class SportScheduleAdmin(admin.ModelAdmin):
     search_fields = ['title']
 
 @admin.register(SportGallery)
-class SportGalleryAdmin(admin.ModelAdmin):
+class SportGalleryAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = 'gallery'
     list_display = ['title', 'description']
     search_fields = ['title', 'description']
 
@@ -189,8 +265,9 @@ class FeedbackAdmin(admin.ModelAdmin):
     search_fields = ['description', 'suggestions']
 
 @admin.register(Coach)
-class CoachAdmin(admin.ModelAdmin):
+class CoachAdmin(IndexedSearchMixin, admin.ModelAdmin):
     form = CoachAdminForm
+    search_kind = 'coach'
     list_display = ['name', 'designation', 'experience_years', 'get_sports', 'user']
     list_filter = ['designation', 'sports']
     search_fields = ['name', 'user__email', 'user__first_name', 'user__last_name']
@@ -207,4 +284,68 @@ class CoachAdmin(admin.ModelAdmin):
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == 'user':
             kwargs['queryset'] = CustomUser.objects.filter(is_coach=True)
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
\ No newline at end of file
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_key', 'status', 'attempts', 'run_after', 'updated_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['kind', 'object_key', 'version']
+    readonly_fields = ['kind', 'object_key', 'version', 'attempts', 'locked_by', 'locked_at', 'last_error', 'created_at', 'updated_at']
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(status=Job.PENDING, attempts=0, run_after=timezone.now())
+        self.message_user(request, f"{count} job(s) queued for retry.")
+    retry_jobs.short_description = 'Retry selected jobs'
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'get_recipients', 'status', 'attempts', 'run_after', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    # Bodies can contain password-reset links; staff see the envelope only
+    exclude = ['body', 'html_body']
+    readonly_fields = [field.name for field in OutboxEmail._meta.fields if field.name not in ('body', 'html_body')]
+    actions = ['retry_emails']
+
+    def get_recipients(self, obj):
+        return ', '.join(obj.to)
+    get_recipients.short_description = 'To'
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry_emails(self, request, queryset):
+        count = queryset.exclude(status__in=[OutboxEmail.SENT, OutboxEmail.SENDING]).update(
+            status=OutboxEmail.PENDING, attempts=0, run_after=timezone.now(),
+        )
+        self.message_user(request, f"{count} email(s) queued for another attempt.")
+    retry_emails.short_description = 'Retry selected emails'
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'refcount', 'stored_at']
+    list_filter = ['stored_at']
+    search_fields = ['name', 'sha256']
+    readonly_fields = [field.name for field in MediaBlob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+def perf_report_view(request):
+    """Staff-only page with the per-view figures collected by PerformanceMiddleware."""
+    if request.method == 'POST' and request.user.is_superuser:
+        reset_report()
+        messages.success(request, 'Performance statistics cleared.')
+        return redirect('perf_report')
+    stats.flush()
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Performance report',
+        'rows': merged_report(),
+        'enabled': settings.PERF_MONITORING,
+    }
+    return render(request, 'admin/perf_report.html', context)
@@ -0,0 +1,330 @@
+"""
+Read-only JSON API for the mobile app and display screens.
+
+``/api/v1/<resource>/`` lists sports, matches, teams, standings and events.
+Each ``Resource`` maps public field names to ``values()`` lookups. A page
+is one SQL query, joins included, with no model instances and no per-row
+relation access; match participants come from the denormalized name
+columns. Rows go out through ``json.dumps`` with compact separators.
+
+Query parameters:
+
+* filters per resource: ``sport``, ``status``, ``season``, and
+  ``date_from``/``date_to`` (ISO dates, inclusive);
+* ``fields=a,b``: only these fields (sparse fieldsets);
+* ``cursor``: the ``next`` or ``previous`` value of an earlier response
+  (keyset pagination, see ``KeysetPaginator``);
+* ``limit``: page size, at most ``MAX_LIMIT``.
+
+The ETag is built from the request and the page-cache generations of the
+models a resource reads. ``If-None-Match`` is therefore answered without
+touching the database, and response bodies are cached under the same key.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from Sports_Users.models import CustomUser, Player
+
+from .models import Coach, Event, MatchResult, Sport, Standing, Team
+from .pagecache import PAGE_CACHE_TIMEOUT, generation_tag, page_cache, watch_model
+from .pagination import KeysetPaginator
+
+API_VERSION = 'v1'
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class ApiError(Exception):
+    pass
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_encode)
+
+
+# ---------------------- Filters ----------------------
+
+def _integer(value, name):
+    if not value.isdigit():
+        raise ApiError(f"'{name}' must be a whole number.")
+    return int(value)
+
+
+def _iso_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f"'{name}' must be a date in YYYY-MM-DD format.")
+
+
+def id_filter(lookup):
+    def apply(queryset, value, name):
+        return queryset.filter(**{lookup: _integer(value, name)})
+    return apply
+
+
+def choice_filter(lookup, choices):
+    allowed = [key for key, _ in choices]
+
+    def apply(queryset, value, name):
+        if value not in allowed:
+            raise ApiError(f"'{name}' must be one of: {', '.join(allowed)}.")
+        return queryset.filter(**{lookup: value})
+    return apply
+
+
+def date_filter(lookup, end=False, timestamps=False):
+    """``lookup`` on or after (or, with ``end``, on or before) the given day."""
+    def apply(queryset, value, name):
+        day = _iso_date(value, name)
+        if not timestamps:
+            return queryset.filter(**{f"{lookup}__{'lte' if end else 'gte'}": day})
+        # Compare against midnights so the (date, id) index stays usable
+        if end:
+            day += timedelta(days=1)
+        boundary = timezone.make_aware(datetime.combine(day, time.min))
+        return queryset.filter(**{f"{lookup}__{'lt' if end else 'gte'}": boundary})
+    return apply
+
+
+# ---------------------- Resources ----------------------
+
+class Resource:
+    """
+    One endpoint: ``fields`` maps public names to ``values()`` lookups;
+    ``computed`` maps names to ``(lookups, function of those values)``.
+    Without ``ordering`` the whole (filtered) result is one page.
+    """
+    def __init__(self, name, model, fields, computed=None, filters=None, ordering=None, depends_on=(), prepare=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.computed = computed or {}
+        self.filters = filters or {}
+        self.ordering = ordering
+        self.depends_on = (model, *depends_on)
+        self.prepare = prepare
+        for dependency in self.depends_on:
+            watch_model(dependency)
+
+    @property
+    def field_names(self):
+        return [*self.fields, *self.computed]
+
+    def selected(self, requested):
+        if not requested:
+            return self.field_names
+        names = [name for name in requested.split(',') if name]
+        unknown = [name for name in names if name not in self.fields and name not in self.computed]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(self.field_names)}.")
+        return names
+
+    def lookups(self, names):
+        lookups = {self.fields[name] for name in names if name in self.fields}
+        for name in names:
+            if name in self.computed:
+                lookups.update(self.computed[name][0])
+        if self.ordering:
+            # The cursor is built from the sort keys, so they are always fetched
+            opts = self.model._meta
+            for key in (*self.ordering, 'pk'):
+                key = key.lstrip('-')
+                lookups.add(opts.pk.attname if key == 'pk' else opts.get_field(key).attname)
+        return sorted(lookups)
+
+    def queryset(self, params):
+        queryset = self.model._default_manager.all()
+        for name, apply in self.filters.items():
+            value = params.get(name)
+            if value:
+                queryset = apply(queryset, value, name)
+        if self.prepare is not None:
+            queryset = self.prepare(queryset, params)
+        return queryset
+
+    def serialize(self, rows, names):
+        plain = [(name, self.fields[name]) for name in names if name in self.fields]
+        computed = [(name, *self.computed[name]) for name in names if name in self.computed]
+        data = []
+        for row in rows:
+            item = {name: row[lookup] for name, lookup in plain}
+            for name, lookups, function in computed:
+                item[name] = function(*[row[lookup] for lookup in lookups])
+            data.append(item)
+        return data
+
+
+def _media_url(name):
+    return default_storage.url(name) if name else None
+
+
+def _participant(team_name, first_name, last_name):
+    if team_name:
+        return team_name
+    if first_name or last_name:
+        return f"{first_name} {last_name}".strip()
+    return None
+
+
+def _standings_table(queryset, params):
+    """One sport's table (``sport`` is required); the latest season unless ``season`` is given."""
+    if not params.get('sport'):
+        raise ApiError("'sport' is required for standings.")
+    if not params.get('season'):
+        latest = queryset.order_by('-season').values_list('season', flat=True).first()
+        queryset = queryset.filter(season=latest)
+    # Same order as the standings page (sports_base.standings.league_table)
+    return queryset.order_by('-points', (F('points_against') - F('points_for')).asc(), '-points_for', 'id')
+
+
+MATCH_STATUS_CHOICES = MatchResult._meta.get_field('status').choices
+
+RESOURCES = {resource.name: resource for resource in (
+    Resource(
+        'sports', Sport,
+        fields={'id': 'id', 'name': 'name', 'updated_at': 'updated_at'},
+        computed={'image': (('image',), _media_url)},
+        ordering=('name',),
+    ),
+    Resource(
+        'matches', MatchResult,
+        fields={
+            'id': 'id', 'sport': 'sport_id', 'sport_name': 'sport__name',
+            'team1': 'team1_id', 'team2': 'team2_id',
+            'participant1': 'participant1_name', 'participant2': 'participant2_name',
+            'score1': 'score1', 'score2': 'score2', 'date': 'date', 'location': 'location',
+            'status': 'status', 'result': 'result', 'updated_at': 'updated_at',
+        },
+        filters={
+            'sport': id_filter('sport_id'),
+            'status': choice_filter('status', MATCH_STATUS_CHOICES),
+            'date_from': date_filter('date'),
+            'date_to': date_filter('date', end=True),
+        },
+        ordering=('-date',),
+        depends_on=(Sport,),
+    ),
+    Resource(
+        'teams', Team,
+        fields={
+            'id': 'id', 'name': 'name', 'sport': 'sport_id', 'sport_name': 'sport__name',
+            'coach': 'coach__name', 'updated_at': 'updated_at',
+        },
+        computed={'logo': (('logo',), _media_url)},
+        filters={'sport': id_filter('sport_id')},
+        ordering=('name',),
+        depends_on=(Sport, Coach),
+    ),
+    Resource(
+        'standings', Standing,
+        fields={
+            'id': 'id', 'sport': 'sport_id', 'season': 'season', 'team': 'team_id', 'player': 'player_id',
+            'played': 'played', 'won': 'won', 'drawn': 'drawn', 'lost': 'lost',
+            'points_for': 'points_for', 'points_against': 'points_against', 'points': 'points',
+        },
+        computed={
+            'participant': (('team__name', 'player__user__first_name', 'player__user__last_name'), _participant),
+            'point_difference': (('points_for', 'points_against'), lambda scored, conceded: scored - conceded),
+        },
+        filters={'sport': id_filter('sport_id'), 'season': id_filter('season')},
+        depends_on=(Team, Player, CustomUser),
+        prepare=_standings_table,
+    ),
+    Resource(
+        'events', Event,
+        fields={
+            'id': 'id', 'title': 'title', 'date': 'date', 'location': 'location',
+            'description': 'description', 'updated_at': 'updated_at',
+        },
+        filters={
+            'date_from': date_filter('date', timestamps=True),
+            'date_to': date_filter('date', end=True, timestamps=True),
+        },
+        ordering=('-date',),
+    ),
+)}
+
+
+# ---------------------- Views ----------------------
+
+def _limit(params):
+    value = params.get('limit')
+    if not value:
+        return DEFAULT_LIMIT
+    return min(max(_integer(value, 'limit'), 1), MAX_LIMIT)
+
+
+def _body(resource, params):
+    names = resource.selected(params.get('fields'))
+    rows = resource.queryset(params).values(*resource.lookups(names))
+    if resource.ordering:
+        page = KeysetPaginator(rows, _limit(params), ordering=resource.ordering).get_page(params.get('cursor'))
+        payload = {
+            'data': resource.serialize(page.object_list, names),
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        }
+    else:
+        payload = {'data': resource.serialize(rows, names), 'next': None, 'previous': None}
+    return dumps(payload).encode('utf-8')
+
+
+def _json_response(body, etag):
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    # Shared caches may keep responses but must revalidate; a 304 costs no query
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def resource_list(request, resource):
+    resource = RESOURCES[resource]
+    params = request.GET
+    key_source = f"{API_VERSION}|{request.get_full_path()}|{generation_tag(*resource.depends_on)}"
+    digest = hashlib.md5(key_source.encode('utf-8')).hexdigest()
+    etag = f'"{digest}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+        return response
+    cache = page_cache()
+    key = f'api:{digest}'
+    body = cache.get(key)
+    if body is None:
+        try:
+            body = _body(resource, params)
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        cache.set(key, body, PAGE_CACHE_TIMEOUT)
+    return _json_response(body, etag)
+
+
+@require_safe
+def api_root(request):
+    """Index of the resources, their fields and filters."""
+    return JsonResponse({
+        name: {
+            'url': reverse(f'api:{name}'),
+            'fields': resource.field_names,
+            'filters': list(resource.filters),
+            'paginated': bool(resource.ordering),
+        }
+        for name, resource in RESOURCES.items()
+    }, json_dumps_params={'separators': (',', ':')})
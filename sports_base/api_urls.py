@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('', api.api_root, name='root'),
+    *[path(f'{name}/', api.resource_list, {'resource': name}, name=name) for name in api.RESOURCES],
+]
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SportsBaseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sports_base'
+
+    def ready(self):
+        from . import tasks  # noqa: F401
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,132 @@
+"""
+Targeted notifications.
+
+``notify_players(players, title, ...)`` sends one notification to every
+player in a queryset (a sport, a team, an approval status or any admin
+selection). Recipients are materialized with a single ``INSERT ... SELECT``
+built from the queryset's own SQL, so no player is loaded into Python and
+the fan-out is one statement however large the group. Each send is recorded
+as a ``NotificationBroadcast`` with its recipient count.
+"""
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db import connections, transaction
+from django.shortcuts import render
+
+from Sports_Users.models import CustomUser, Player
+
+from .forms import BroadcastMessageForm
+from .inbox import forget_all_unread_counts
+from .models import Notification, NotificationBroadcast, Sport, Team
+from .search import index_queryset
+
+
+def target_players(sport=None, team=None, status=None):
+    """Active players matching every given criterion."""
+    players = Player.objects.filter(user__is_active=True)
+    if sport is not None:
+        players = players.filter(sport=sport)
+    if team is not None:
+        players = players.filter(teams=team)
+    if status:
+        players = players.filter(user__status=status)
+    return players
+
+
+def describe_target(sport=None, team=None, status=None):
+    parts = []
+    if sport is not None:
+        parts.append(f"Sport: {sport.name}")
+    if team is not None:
+        parts.append(f"Team: {team.name}")
+    if status:
+        parts.append(f"Status: {dict(CustomUser.STATUS_CHOICES).get(status, status)}")
+    return ', '.join(parts) or 'All players'
+
+
+def deliver(broadcast, players):
+    """Save ``broadcast`` and give each of ``players`` its notification; return the recipient count."""
+    using = players.db
+    recipients_sql, recipients_params = players.order_by().values('user_id').distinct().query.sql_with_params()
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(Notification._meta.get_field(name).column)
+        for name in ('title', 'message', 'created_at', 'is_general', 'broadcast', 'recipient')
+    )
+    with transaction.atomic(using=using):
+        broadcast.save(using=using)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(Notification._meta.db_table)} ({columns}) "
+                f"SELECT %s, %s, %s, %s, %s, recipients.user_id FROM ({recipients_sql}) recipients",
+                [
+                    broadcast.title,
+                    broadcast.message,
+                    connection.ops.adapt_datetimefield_value(broadcast.created_at),
+                    False,
+                    broadcast.pk,
+                    *recipients_params,
+                ],
+            )
+            broadcast.recipient_count = cursor.rowcount
+        broadcast.save(using=using, update_fields=['recipient_count'])
+        index_queryset('notification', broadcast.notifications.all())
+        # No post_save signals for the inserted rows, so drop every cached unread count at once
+        transaction.on_commit(forget_all_unread_counts, using=using)
+    return broadcast.recipient_count
+
+
+def notify_players(players, title, message='', target='', sent_by=None):
+    """Send a notification to every player in ``players``; return the ``NotificationBroadcast``."""
+    broadcast = NotificationBroadcast(title=title, message=message, target=target, sent_by=sent_by)
+    deliver(broadcast, players)
+    return broadcast
+
+
+def selected_players(queryset):
+    """The active players behind an admin selection of players, teams or sports."""
+    if queryset.model is Player:
+        return queryset.filter(user__is_active=True)
+    if queryset.model is Team:
+        return Player.objects.filter(user__is_active=True, teams__in=queryset.values('pk'))
+    if queryset.model is Sport:
+        return Player.objects.filter(user__is_active=True, sport__in=queryset.values('pk'))
+    raise ValueError(f"Cannot notify players of {queryset.model.__name__} objects.")
+
+
+def _describe_selection(queryset, limit=3):
+    names = [str(obj) for obj in queryset[:limit + 1]]
+    label = queryset.model._meta.verbose_name_plural.title()
+    if len(names) > limit:
+        return f"{label}: {', '.join(names[:limit])} and {queryset.count() - limit} more"
+    return f"{label}: {', '.join(names)}"
+
+
+@admin.action(description='Send a notification to the selected players')
+def send_notification(modeladmin, request, queryset):
+    """Admin action for players, teams and sports; asks for the message on an intermediate page."""
+    players = selected_players(queryset)
+    form = BroadcastMessageForm(request.POST if 'apply' in request.POST else None)
+    if form.is_valid():
+        broadcast = notify_players(
+            players,
+            form.cleaned_data['title'],
+            form.cleaned_data['message'],
+            target=_describe_selection(queryset)[:255],
+            sent_by=request.user,
+        )
+        modeladmin.message_user(request, f"Notification sent to {broadcast.recipient_count} player(s).", messages.SUCCESS)
+        return None
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Send a notification',
+        'form': form,
+        'opts': modeladmin.model._meta,
+        'queryset': queryset,
+        'target': _describe_selection(queryset),
+        'recipient_count': players.values('user_id').distinct().count(),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        'select_across': request.POST.get('select_across', '0'),
+    }
+    return render(request, 'admin/send_notification.html', context)
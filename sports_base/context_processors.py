@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .inbox import unread_count
+
+
+def inbox(request):
+    """``unread_notifications`` for the navbar; only computed if a template uses it."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {'unread_notifications': 0}
+    return {'unread_notifications': SimpleLazyObject(lambda: unread_count(user))}
@@ -0,0 +1,157 @@
+"""
+Concurrent write benchmark for ``manage.py dbbenchmark``.
+
+Worker processes stand in for gunicorn workers. Each runs short write
+transactions shaped like a registration: insert a row, bump a shared
+counter, read a count. Between transactions each worker calls
+``close_old_connections()``, as the request cycle does, so
+``CONN_MAX_AGE`` and pooling take effect. The scratch tables are created for
+the run and dropped afterwards.
+
+A baseline run uses the same database with the driver defaults: no
+OPTIONS, no persistent connections and, on SQLite, the rollback journal. It
+shows what the tuned profile buys.
+
+The benchmark never touches the configured database. It runs the configured
+profile against a scratch database named on the command line: an SQLite file,
+or an existing PostgreSQL database.
+"""
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+
+SCRATCH_TABLE = 'dbbenchmark_scratch'
+COUNTER_TABLE = 'dbbenchmark_counter'
+START_DELAY = 1.0  # seconds for every worker to connect before the clock starts
+
+
+def _baseline_settings(settings_dict):
+    settings_dict['OPTIONS'] = {}
+    settings_dict['CONN_MAX_AGE'] = 0
+
+
+def _same_database(name, configured, vendor):
+    if vendor == 'sqlite':
+        return os.path.realpath(str(name)) == os.path.realpath(str(configured))
+    return str(name) == str(configured)
+
+
+def use_scratch_database(name):
+    """Point the default connection at scratch database ``name``; refuse the configured one."""
+    if _same_database(name, connection.settings_dict['NAME'], connection.vendor):
+        raise ValueError("Refusing to benchmark the configured database; name a scratch database instead.")
+    connections.close_all()
+    connection.settings_dict['NAME'] = name
+
+
+def _init_worker(name, baseline):
+    django.setup()
+    # Connections inherited from the parent must not be shared across processes
+    connections.close_all()
+    connection.settings_dict['NAME'] = name
+    if baseline:
+        _baseline_settings(connection.settings_dict)
+
+
+def create_tables():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SCRATCH_TABLE} ('
+            'worker INTEGER NOT NULL, seq INTEGER NOT NULL, payload VARCHAR(200) NOT NULL, '
+            'PRIMARY KEY (worker, seq))'
+        )
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {COUNTER_TABLE} (id INTEGER PRIMARY KEY, hits INTEGER NOT NULL)')
+        cursor.execute(f'DELETE FROM {SCRATCH_TABLE}')
+        cursor.execute(f'DELETE FROM {COUNTER_TABLE}')
+        cursor.execute(f'INSERT INTO {COUNTER_TABLE} (id, hits) VALUES (1, 0)')
+
+
+def drop_tables():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {SCRATCH_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {COUNTER_TABLE}')
+
+
+def write_worker(worker, writes, start_at):
+    """Run ``writes`` transactions; return (latencies in ms, errors, finish time)."""
+    latencies = []
+    errors = 0
+    # Connect (and run any init commands) before the clock starts
+    connection.ensure_connection()
+    time.sleep(max(0, start_at - time.time()))
+    for seq in range(writes):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'INSERT INTO {SCRATCH_TABLE} (worker, seq, payload) VALUES (%s, %s, %s)',
+                        [worker, seq, f'player-{worker}-{seq}@example.com'],
+                    )
+                    cursor.execute(f'UPDATE {COUNTER_TABLE} SET hits = hits + 1 WHERE id = 1')
+                    cursor.execute(f'SELECT COUNT(*) FROM {SCRATCH_TABLE} WHERE worker = %s', [worker])
+                    cursor.fetchone()
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append((time.perf_counter() - started) * 1000)
+        close_old_connections()
+    return latencies, errors, time.time()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_benchmark(workers, writes, baseline=False):
+    """Run one benchmark round; return a dict of throughput and latency figures."""
+    create_tables()
+    if baseline and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=DELETE')
+    connections.close_all()
+    start_at = time.time() + START_DELAY
+    initargs = (connection.settings_dict['NAME'], baseline)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = [pool.submit(write_worker, worker, writes, start_at) for worker in range(workers)]
+        results = [future.result() for future in futures]
+    latencies = [latency for worker_latencies, _, _ in results for latency in worker_latencies]
+    elapsed = max(finished for _, _, finished in results) - start_at
+    return {
+        'workers': workers,
+        'committed': len(latencies),
+        'errors': sum(errors for _, errors, _ in results),
+        'seconds': elapsed,
+        'per_second': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'p95_ms': _percentile(latencies, 0.95),
+        'max_ms': max(latencies, default=0.0),
+    }
+
+
+def describe_database():
+    """Settings that matter for write concurrency, as (name, value) pairs."""
+    settings_dict = connection.settings_dict
+    described = [
+        ('engine', connection.vendor),
+        ('database', settings_dict['NAME']),
+        ('CONN_MAX_AGE', settings_dict.get('CONN_MAX_AGE')),
+        ('CONN_HEALTH_CHECKS', settings_dict.get('CONN_HEALTH_CHECKS')),
+    ]
+    if connection.vendor == 'sqlite':
+        described.append(('transaction_mode', settings_dict.get('OPTIONS', {}).get('transaction_mode') or 'DEFERRED'))
+        with connection.cursor() as cursor:
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size'):
+                cursor.execute(f'PRAGMA {pragma}')
+                described.append((pragma, cursor.fetchone()[0]))
+    else:
+        pool = settings_dict.get('OPTIONS', {}).get('pool')
+        described.append(('pool', f"{pool['min_size']}-{pool['max_size']}" if isinstance(pool, dict) else bool(pool)))
+    return described
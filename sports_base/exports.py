@@ -0,0 +1,189 @@
+"""
+Streaming CSV/XLSX exports for the admin and ``manage.py export_data``.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)``, so the
+related names come from joins and no model instances are built; memory
+stays flat however many rows are exported. CSV is streamed straight into a
+``StreamingHttpResponse``. XLSX needs openpyxl and is written in its
+write-only mode to a temporary file, which is then streamed back.
+"""
+import csv
+import tempfile
+from datetime import datetime
+
+from django.contrib import messages
+from django.db.models import Count
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from Sports_Users.models import CustomUser, Player
+
+from .models import MatchResult, Team
+
+EXPORT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class ExportSpec:
+    """
+    Columns of one export: ``(header, lookup path)`` pairs.
+
+    Choice fields are written with their display labels. Player headers
+    match the ``import_players`` columns, so an export can be re-imported.
+    """
+    def __init__(self, name, model, columns, annotations=None):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.annotations = annotations or {}
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def _choices(self, path):
+        model, field = self.model, None
+        for part in path.split('__'):
+            if part in self.annotations:
+                return None
+            field = model._meta.get_field(part)
+            if field.is_relation:
+                model = field.related_model
+        return dict(field.flatchoices) if field.choices else None
+
+    def rows(self, queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield one tuple per row of ``queryset`` (default: every row), keeping its ordering."""
+        if queryset is None:
+            queryset = self.model._default_manager.order_by('pk')
+        paths = [path for _, path in self.columns]
+        choices = [self._choices(path) for path in paths]
+        queryset = queryset.annotate(**self.annotations).values_list(*paths)
+        for row in queryset.iterator(chunk_size=chunk_size):
+            yield tuple(labels.get(value, value) if labels else value for labels, value in zip(choices, row))
+
+
+EXPORTS = {
+    'players': ExportSpec('players', Player, [
+        ('Email', 'user__email'),
+        ('First Name', 'user__first_name'),
+        ('Last Name', 'user__last_name'),
+        ('CNIC', 'user__cnic'),
+        ('Phone Number', 'user__phone_number'),
+        ('Status', 'user__status'),
+        ('Father Name', 'father_name'),
+        ('Father CNIC', 'father_cnic'),
+        ('DOB', 'dob'),
+        ('WhatsApp Number', 'whatsapp_number'),
+        ('Province', 'province'),
+        ('City', 'city'),
+        ('Address', 'address'),
+        ('Sport', 'sport__name'),
+        ('Height', 'height'),
+        ('Weight', 'weight'),
+        ('College Roll No', 'college_roll_no'),
+        ('Blood Group', 'blood_group'),
+        ('Disability', 'disability'),
+        ('Disability Detail', 'disability_detail'),
+    ]),
+    'teams': ExportSpec('teams', Team, [
+        ('ID', 'id'),
+        ('Name', 'name'),
+        ('Sport', 'sport__name'),
+        ('Coach', 'coach__name'),
+        ('Players', 'player_count'),
+        ('Created', 'created_at'),
+    ], annotations={'player_count': Count('players')}),
+    'matches': ExportSpec('matches', MatchResult, [
+        ('ID', 'id'),
+        ('Sport', 'sport__name'),
+        ('Date', 'date'),
+        ('Location', 'location'),
+        ('Status', 'status'),
+        ('Participant 1', 'participant1_name'),
+        ('Participant 2', 'participant2_name'),
+        ('Score 1', 'score1'),
+        ('Score 2', 'score2'),
+        ('Result', 'result'),
+    ]),
+    'users': ExportSpec('users', CustomUser, [
+        ('Email', 'email'),
+        ('Username', 'username'),
+        ('First Name', 'first_name'),
+        ('Last Name', 'last_name'),
+        ('CNIC', 'cnic'),
+        ('Phone Number', 'phone_number'),
+        ('Status', 'status'),
+        ('Coach', 'is_coach'),
+        ('Player', 'is_player'),
+        ('Staff', 'is_staff'),
+        ('Active', 'is_active'),
+        ('Date Joined', 'date_joined'),
+        ('Last Login', 'last_login'),
+    ]),
+}
+
+EXPORTS_BY_MODEL = {spec.model: spec for spec in EXPORTS.values()}
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(spec, queryset=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(spec.headers)
+    for row in spec.rows(queryset):
+        yield writer.writerow(row)
+
+
+def _xlsx_cell(value):
+    # openpyxl rejects timezone-aware datetimes
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def write_xlsx(spec, queryset, file):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(spec.name.title())
+    sheet.append(spec.headers)
+    for row in spec.rows(queryset):
+        sheet.append([_xlsx_cell(value) for value in row])
+    workbook.save(file)
+
+
+def export_filename(spec, extension):
+    return f"{spec.name}-{timezone.localdate():%Y-%m-%d}.{extension}"
+
+
+def csv_response(spec, queryset=None):
+    response = StreamingHttpResponse(csv_lines(spec, queryset), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(spec, "csv")}"'
+    return response
+
+
+def xlsx_response(spec, queryset=None):
+    file = tempfile.TemporaryFile()
+    write_xlsx(spec, queryset, file)
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=export_filename(spec, 'xlsx'), content_type=XLSX_CONTENT_TYPE)
+
+
+def export_as_csv(modeladmin, request, queryset):
+    # With "select all" ticked, queryset is the changelist's filtered and searched rows
+    return csv_response(EXPORTS_BY_MODEL[queryset.model], queryset)
+export_as_csv.short_description = 'Export selected rows as CSV'
+
+
+def export_as_xlsx(modeladmin, request, queryset):
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        modeladmin.message_user(request, "XLSX export needs openpyxl; use CSV instead.", messages.ERROR)
+        return None
+    return xlsx_response(EXPORTS_BY_MODEL[queryset.model], queryset)
+export_as_xlsx.short_description = 'Export selected rows as Excel (XLSX)'
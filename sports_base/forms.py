@@ -16,4 +16,8 @@ class FeedbackForm(forms.ModelForm):
         rating = self.cleaned_data.get('rating')
         if not 1 <= rating <= 5:
             raise forms.ValidationError("Rating must be between 1 and 5.")
-        return rating
\ No newline at end of file
+        return rating
+
+class BroadcastMessageForm(forms.Form):
+    title = forms.CharField(max_length=255)
+    message = forms.CharField(widget=forms.Textarea(attrs={'rows': 4}), required=False)
@@ -0,0 +1,116 @@
+"""
+Responsive image derivatives.
+
+Every uploaded image in ``RESPONSIVE_IMAGE_FIELDS`` gets resized WebP and JPEG
+copies at the widths in ``IMAGE_DERIVATIVE_WIDTHS``. Copies are stored under
+``derivatives/`` in the default storage with names derived from the source
+content hash, so they can be cached forever. The ``responsive_img`` template
+tag turns them into ``srcset``/``sizes`` markup.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .jobs import enqueue_on_commit
+from .models import ImageVariantSet
+from .pagecache import invalidate_model
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (160, 320, 640, 1024, 1600))
+DERIVATIVE_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+DERIVATIVE_QUALITY = getattr(settings, 'IMAGE_DERIVATIVE_QUALITY', 80)
+
+# (model label, image field name) pairs that get derivatives.
+RESPONSIVE_IMAGE_FIELDS = getattr(settings, 'RESPONSIVE_IMAGE_FIELDS', (
+    ('sports_base.SportGallery', 'image'),
+    ('sports_base.Coach', 'photo'),
+    ('static_pages.HomePic', 'image'),
+    ('Sports_Users.CustomUser', 'profile_picture'),
+))
+
+CACHE_TIMEOUT = 60 * 60 * 24
+MISSING = 'missing'
+
+
+def _cache_key(source):
+    return 'imgset:' + hashlib.md5(source.encode('utf-8')).hexdigest()
+
+
+def build_derivatives(field_file):
+    """Resize ``field_file`` into every configured width and format."""
+    with field_file.open('rb') as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+    src_width, src_height = image.size
+
+    widths = sorted({w for w in DERIVATIVE_WIDTHS if w < src_width} | {min(src_width, max(DERIVATIVE_WIDTHS))})
+    variants = []
+    for width in widths:
+        height = max(1, round(src_height * width / src_width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != src_width else image
+        for ext, fmt in DERIVATIVE_FORMATS:
+            name = f"derivatives/{digest[:2]}/{digest[:16]}-{width}.{ext}"
+            if not default_storage.exists(name):
+                buf = BytesIO()
+                out = resized.convert('RGB') if fmt == 'JPEG' else resized
+                out.save(buf, format=fmt, quality=DERIVATIVE_QUALITY, optimize=True)
+                name = default_storage.save(name, ContentFile(buf.getvalue()))
+            variants.append({'w': width, 'fmt': ext, 'name': name})
+
+    variant_set, _ = ImageVariantSet.objects.update_or_create(
+        source=field_file.name,
+        defaults={'digest': digest, 'width': src_width, 'height': src_height, 'variants': variants},
+    )
+    cache.set(_cache_key(field_file.name), _serialize(variant_set), CACHE_TIMEOUT)
+    # Cached pages still point at the original upload
+    invalidate_model(type(field_file.instance))
+    return variant_set
+
+
+def _serialize(variant_set):
+    return {
+        'width': variant_set.width,
+        'height': variant_set.height,
+        'variants': variant_set.variants,
+    }
+
+
+def get_variants(source):
+    """Return the cached derivative description for ``source``, or None."""
+    key = _cache_key(source)
+    data = cache.get(key)
+    if data is None:
+        variant_set = ImageVariantSet.objects.filter(source=source).first()
+        data = _serialize(variant_set) if variant_set else MISSING
+        cache.set(key, data, CACHE_TIMEOUT if variant_set else 60)
+    return None if data == MISSING else data
+
+
+def srcset_for(data, fmt):
+    return ', '.join(
+        f"{default_storage.url(v['name'])} {v['w']}w" for v in data['variants'] if v['fmt'] == fmt
+    )
+
+
+def queue_derivatives(instance, field_name):
+    """Queue a derivative build for ``instance.<field_name>`` if it has a file."""
+    field_file = getattr(instance, field_name)
+    if field_file:
+        enqueue_on_commit('image_derivatives', instance, version=f"{field_name}:{field_file.name}")
+
+
+def request_derivatives(field_file):
+    """Queue a build for an image first seen without derivatives (at most every few minutes)."""
+    if cache.add('imgset-queued:' + _cache_key(field_file.name), True, 300):
+        queue_derivatives(field_file.instance, field_file.field.name)
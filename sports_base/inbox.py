@@ -0,0 +1,111 @@
+"""
+Notification inbox.
+
+A user's inbox is every general notification plus the ones addressed to
+them, assembled when read (fan-out on read), so a broadcast stays a single
+row. Read state is one ``NotificationReadState`` row per user. Inbox pages
+are paginated by seeking on (created_at, id). The navbar's unread count is
+cached per user and dropped whenever it could change.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification, NotificationReadState
+from .pagination import KeysetPaginator
+
+INBOX_PAGE_SIZE = 10
+UNREAD_CACHE_TIMEOUT = 5 * 60
+GENERAL_GENERATION_KEY = 'inbox:general:gen'
+
+
+def inbox_queryset(user):
+    return Notification.objects.filter(Q(is_general=True) | Q(recipient=user))
+
+
+def _state_key(user_id):
+    return f'inbox:state:{user_id}'
+
+
+def read_state(user):
+    """The user's read markers; cached, as only mark_read()/mark_all_read() change them."""
+    state = cache.get(_state_key(user.pk))
+    if state is None:
+        # Notifications sent before the user joined start out read
+        state, _ = NotificationReadState.objects.get_or_create(user=user, defaults={'read_until': user.date_joined})
+        cache.set(_state_key(user.pk), state, UNREAD_CACHE_TIMEOUT)
+    return state
+
+
+def _save_state(state, fields):
+    state.save(update_fields=fields + ['updated_at'])
+    cache.set(_state_key(state.user_id), state, UNREAD_CACHE_TIMEOUT)
+    forget_unread_count(state.user_id)
+
+
+def _general_generation():
+    generation = cache.get(GENERAL_GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERAL_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(GENERAL_GENERATION_KEY)
+    return generation
+
+
+def _unread_key(user_id):
+    return f'inbox:unread:{user_id}'
+
+
+def unread_count(user):
+    """Unread notifications for ``user``; cached until a notification or their read state changes."""
+    generation = _general_generation()
+    cached = cache.get(_unread_key(user.pk))
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    state = read_state(user)
+    count = inbox_queryset(user).filter(created_at__gt=state.read_until).exclude(id__in=state.read_ids).count()
+    cache.set(_unread_key(user.pk), (generation, count), UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def forget_unread_count(user_id):
+    cache.delete(_unread_key(user_id))
+
+
+def forget_all_unread_counts():
+    try:
+        cache.incr(GENERAL_GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERAL_GENERATION_KEY, time.time_ns(), None)
+
+
+def notification_changed(notification):
+    """Drop the unread counts a created, edited or deleted notification affects."""
+    if notification.is_general:
+        forget_all_unread_counts()
+    if notification.recipient_id:
+        forget_unread_count(notification.recipient_id)
+
+
+def mark_read(user, notification):
+    state = read_state(user)
+    if not state.is_read(notification):
+        state.read_ids.append(notification.id)
+        _save_state(state, ['read_ids'])
+
+
+def mark_all_read(user):
+    state = read_state(user)
+    state.read_until = max(timezone.now(), state.read_until)
+    state.read_ids = []
+    _save_state(state, ['read_until', 'read_ids'])
+
+
+def inbox_page(user, page=None, per_page=INBOX_PAGE_SIZE):
+    """One page of the inbox, newest first, with ``is_unread`` set on each row."""
+    page_obj = KeysetPaginator(inbox_queryset(user), per_page, ordering=('-created_at',)).get_page(page)
+    state = read_state(user)
+    for notification in page_obj:
+        notification.is_unread = not state.is_read(notification)
+    return page_obj
@@ -0,0 +1,162 @@
+"""
+Database-backed job queue.
+
+Work is registered with ``@job_handler('<kind>')`` and queued with
+``enqueue('<kind>', obj, version=...)``. Jobs are deduplicated on
+(kind, object, version), so enqueueing the same version twice is a no-op.
+``manage.py jobworker`` claims due jobs and runs them in a process pool.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+# Seconds before the first retry; doubled on every further attempt.
+RETRY_BACKOFF = getattr(settings, 'JOB_RETRY_BACKOFF', 30)
+# A running job untouched for this long is assumed to belong to a dead worker.
+STALE_AFTER = getattr(settings, 'JOB_STALE_AFTER', 15 * 60)
+
+
+def job_handler(kind):
+    """Register ``func(job)`` as the handler for jobs of ``kind``."""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def object_key_for(obj):
+    return f"{obj._meta.label_lower}:{obj.pk}"
+
+
+def get_job_object(job):
+    """Load the model instance a job was enqueued for, or None if it is gone."""
+    label, pk = job.object_key.rsplit(':', 1)
+    model = apps.get_model(label)
+    return model._default_manager.filter(pk=pk).first()
+
+
+def enqueue(kind, obj=None, version='', run_after=None, max_attempts=5):
+    """
+    Queue a job, returning the (possibly pre-existing) Job row.
+
+    A job for the same kind, object and version that already exists is left as
+    it is, whatever its status.
+    """
+    object_key = object_key_for(obj) if obj is not None else ''
+    version = str(version)[:255]
+    try:
+        with transaction.atomic():
+            job, _ = Job.objects.get_or_create(
+                kind=kind,
+                object_key=object_key,
+                version=version,
+                defaults={
+                    'run_after': run_after or timezone.now(),
+                    'max_attempts': max_attempts,
+                },
+            )
+    except IntegrityError:
+        job = Job.objects.get(kind=kind, object_key=object_key, version=version)
+    return job
+
+
+def enqueue_on_commit(kind, obj=None, version='', **kwargs):
+    """Queue a job once the surrounding transaction commits."""
+    transaction.on_commit(lambda: enqueue(kind, obj, version, **kwargs))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_stale_jobs():
+    cutoff = timezone.now() - timedelta(seconds=STALE_AFTER)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.PENDING, locked_by='', locked_at=None,
+    )
+
+
+def claim_jobs(limit, worker=None):
+    """
+    Atomically mark up to ``limit`` due jobs as running and return their ids.
+
+    Each claim is a conditional UPDATE on ``status='pending'``, so concurrent
+    workers never run the same job twice. This works on SQLite, which has no
+    ``SELECT ... FOR UPDATE SKIP LOCKED``.
+    """
+    worker = worker or worker_name()
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_after__lte=now
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit * 2]
+
+    claimed = []
+    for job_id in candidates:
+        updated = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if updated:
+            claimed.append(job_id)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def run_job(job_id):
+    """Run one claimed job and record its outcome. Returns the final status."""
+    close_old_connections()
+    job = Job.objects.get(id=job_id)
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        handler(job)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            logger.error(f"Job {job.id} ({job.kind}) failed permanently: {job.last_error}")
+        else:
+            job.status = Job.PENDING
+            delay = RETRY_BACKOFF * (2 ** (job.attempts - 1))
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            logger.warning(f"Job {job.id} ({job.kind}) failed, retrying in {delay}s")
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=['status', 'last_error', 'run_after', 'locked_by', 'locked_at', 'updated_at'])
+    close_old_connections()
+    return job.status
+
+
+def run_pending_jobs(limit=100):
+    """Drain due jobs in the current process (useful for tests and cron)."""
+    count = 0
+    while count < limit:
+        ids = claim_jobs(min(10, limit - count))
+        if not ids:
+            break
+        for job_id in ids:
+            run_job(job_id)
+        count += len(ids)
+    return count
@@ -0,0 +1,151 @@
+"""
+Live score change feed.
+
+Each server process runs a single poller thread that looks for recently
+updated matches once every ``LIVE_SCORES_POLL_INTERVAL`` seconds. Clients
+(long-poll requests or Server-Sent Event streams) wait on that shared feed
+instead of querying the database themselves, so the database load does not
+grow with the number of fans watching. The thread runs only while someone is
+watching: it stops after ``LIVE_SCORES_IDLE_TIMEOUT`` seconds without a
+request and the next request starts it again.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MatchResult
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = getattr(settings, 'LIVE_SCORES_POLL_INTERVAL', 2.0)
+# Longer than a long-poll wait, so a stream waiting on the feed keeps it running
+IDLE_TIMEOUT = getattr(settings, 'LIVE_SCORES_IDLE_TIMEOUT', 60.0)
+# How long a finished match stays in the feed so clients see its final score.
+RETAIN_FOR = timedelta(minutes=10)
+# Re-read rows this far behind the newest timestamp seen, in case another
+# worker's clock is slightly behind ours. Unchanged rows are filtered out.
+OVERLAP = timedelta(seconds=5)
+
+FEED_FIELDS = (
+    'id', 'status', 'result', 'score1', 'score2',
+    'participant1_name', 'participant2_name', 'updated_at',
+)
+
+
+def match_payload(values):
+    match = MatchResult(**{field: values[field] for field in FEED_FIELDS})
+    return {
+        'id': match.id,
+        'status': match.status,
+        'status_display': match.get_status_display(),
+        'score1': match.score1,
+        'score2': match.score2,
+        'result': match.result,
+        'result_text': match.get_result_display_text(),
+        'winning_side': match.winning_side,
+    }
+
+
+def to_cursor(value):
+    """Encode a timestamp as an integer cursor shared by every server process."""
+    return int(value.timestamp() * 1_000_000)
+
+
+class LiveScoreFeed:
+    def __init__(self, poll_interval=POLL_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.version = 0  # bumped on every publish; only used to wake waiters
+        self._entries = {}  # match id -> (cursor, payload, seen_at)
+        self._newest = None
+        self._condition = threading.Condition()
+        self._thread = None
+        self._last_request = 0.0
+
+    def start(self):
+        """Start polling, or keep it going for another ``idle_timeout`` seconds."""
+        with self._condition:
+            self._last_request = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-score-feed', daemon=True)
+                self._thread.start()
+
+    def _idle(self):
+        # Checked and cleared under the lock, so start() either sees the thread gone or keeps it going
+        with self._condition:
+            if time.monotonic() - self._last_request < self.idle_timeout:
+                return False
+            self._thread = None
+            return True
+
+    def _run(self):
+        while not self._idle():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Live score feed poll failed: {e}")
+            finally:
+                close_old_connections()
+            time.sleep(self.poll_interval)
+
+    def poll(self):
+        """Read matches changed since the last poll and publish the changes."""
+        now = timezone.now()
+        if self._newest is None:
+            matches = MatchResult.objects.filter(Q(status='live') | Q(updated_at__gte=now - RETAIN_FOR))
+        else:
+            matches = MatchResult.objects.filter(updated_at__gte=self._newest - OVERLAP)
+        rows = list(matches.values(*FEED_FIELDS))
+
+        with self._condition:
+            changed = False
+            for row in rows:
+                payload = match_payload(row)
+                previous = self._entries.get(row['id'])
+                if self._newest is None or row['updated_at'] > self._newest:
+                    self._newest = row['updated_at']
+                if previous and previous[1] == payload:
+                    continue
+                self._entries[row['id']] = (to_cursor(row['updated_at']), payload, now)
+                changed = True
+            if self._newest is None:
+                self._newest = now
+            for match_id, (cursor, payload, seen_at) in list(self._entries.items()):
+                if payload['status'] != 'live' and now - seen_at > RETAIN_FOR:
+                    del self._entries[match_id]
+            if changed:
+                self.version += 1
+                self._condition.notify_all()
+
+    def changes_since(self, since):
+        """Return ``(cursor, payloads)`` for matches updated after cursor ``since``."""
+        with self._condition:
+            entries = [(cursor, payload) for cursor, payload, _ in self._entries.values()
+                       if since is None or cursor > since]
+        cursor = max([c for c, _ in entries], default=since or 0)
+        return cursor, [payload for _, payload in entries]
+
+    def wait(self, since, timeout):
+        """
+        Block until a match changes after cursor ``since`` or ``timeout`` elapses.
+
+        Passing ``since=None`` returns the current snapshot straight away.
+        """
+        self.start()
+        with self._condition:
+            version = self.version
+        cursor, payloads = self.changes_since(since)
+        if payloads or since is None:
+            return cursor, payloads
+        with self._condition:
+            self._condition.wait_for(lambda: self.version > version, timeout=timeout)
+        return self.changes_since(since)
+
+
+feed = LiveScoreFeed()
@@ -0,0 +1,172 @@
+"""
+Email outbox.
+
+``OutboxBackend`` is the project's ``EMAIL_BACKEND``: sending a message only
+inserts an ``OutboxEmail`` row, so requests never wait on SMTP. ``manage.py
+send_outbox`` claims due rows in batches and delivers them through
+``OUTBOX_DELIVERY_BACKEND`` (SMTP in production; the console, file or
+locmem backends, or a local SMTP stand-in, in development), reusing one
+connection for as long as there is mail to send. Failed messages are retried
+with exponential backoff. Sent messages keep their envelope but not their
+bodies, which may contain password-reset links.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import F
+from django.utils import timezone
+
+from .jobs import worker_name
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_BACKEND = getattr(settings, 'OUTBOX_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+# Seconds before the first retry; doubled on every further attempt.
+RETRY_BACKOFF = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 60)
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+# A message left 'sending' for this long belongs to a sender that died.
+STALE_AFTER = 15 * 60
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Store messages in the outbox instead of sending them."""
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if message.attachments:
+                # Attachments are not stored in the outbox; hand these straight to the delivery backend
+                get_connection(DELIVERY_BACKEND, fail_silently=self.fail_silently).send_messages([message])
+                continue
+            html_body = ''
+            for content, mimetype in getattr(message, 'alternatives', []):
+                if mimetype == 'text/html':
+                    html_body = content
+            rows.append(OutboxEmail(
+                subject=message.subject[:255],
+                body=message.body,
+                html_body=html_body,
+                from_email=message.from_email,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                max_attempts=MAX_ATTEMPTS,
+            ))
+        OutboxEmail.objects.bulk_create(rows)
+        return len(email_messages)
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def requeue_stale_emails():
+    cutoff = timezone.now() - timedelta(seconds=STALE_AFTER)
+    return OutboxEmail.objects.filter(status=OutboxEmail.SENDING, locked_at__lt=cutoff).update(
+        status=OutboxEmail.PENDING, locked_by='', locked_at=None,
+    )
+
+
+def claim_emails(limit, worker=None):
+    """Mark up to ``limit`` due messages as sending and return them (see ``jobs.claim_jobs``)."""
+    worker = worker or worker_name()
+    now = timezone.now()
+    candidates = OutboxEmail.objects.filter(
+        status=OutboxEmail.PENDING, run_after__lte=now
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+    claimed = [
+        email_id for email_id in candidates
+        if OutboxEmail.objects.filter(id=email_id, status=OutboxEmail.PENDING).update(
+            status=OutboxEmail.SENDING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+    ]
+    return list(OutboxEmail.objects.filter(id__in=claimed).order_by('id'))
+
+
+def _record_failure(email, error):
+    email.last_error = str(error)
+    if email.attempts >= email.max_attempts:
+        email.status = OutboxEmail.FAILED
+        logger.error(f"Giving up on email {email.pk} to {email.to}: {error}")
+    else:
+        email.status = OutboxEmail.PENDING
+        delay = RETRY_BACKOFF * (2 ** (email.attempts - 1))
+        email.run_after = timezone.now() + timedelta(seconds=delay)
+        logger.warning(f"Email {email.pk} to {email.to} failed, retrying in {delay}s: {error}")
+
+
+def _release(emails):
+    """Hand claimed but unattempted messages back to the queue."""
+    OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+        status=OutboxEmail.PENDING, locked_by='', locked_at=None, attempts=F('attempts') - 1,
+    )
+
+
+def _finish(email):
+    email.locked_by = ''
+    email.locked_at = None
+    email.save(update_fields=[
+        'status', 'sent_at', 'last_error', 'run_after', 'locked_by', 'locked_at', 'body', 'html_body',
+    ])
+
+
+def send_outbox(batch_size=BATCH_SIZE, worker=None):
+    """
+    Deliver due messages until none are left; return ``(sent, failed)`` counts.
+
+    One delivery connection is reused for the whole run and reopened after a
+    failed message. If the server cannot be reached at all the run stops,
+    leaving the rest of the batch for the next one.
+    """
+    requeue_stale_emails()
+    sent = failed = 0
+    connection = get_connection(DELIVERY_BACKEND, fail_silently=False)
+    try:
+        while True:
+            batch = claim_emails(batch_size, worker)
+            if not batch:
+                break
+            for index, email in enumerate(batch):
+                try:
+                    connection.open()
+                except Exception as e:
+                    _record_failure(email, e)
+                    _finish(email)
+                    _release(batch[index + 1:])
+                    return sent, failed + 1
+                try:
+                    connection.send_messages([build_message(email, connection)])
+                except Exception as e:
+                    _record_failure(email, e)
+                    failed += 1
+                    connection.close()
+                else:
+                    email.status = OutboxEmail.SENT
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    email.body = email.html_body = ''
+                    sent += 1
+                _finish(email)
+    finally:
+        connection.close()
+    return sent, failed
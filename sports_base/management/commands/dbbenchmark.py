@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sports_base.dbbench import describe_database, drop_tables, run_benchmark, use_scratch_database
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent write throughput of the configured database profile on a scratch database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'database',
+            help="Scratch database to run against: an SQLite file path, or the name of an existing "
+                 "PostgreSQL database. Never the configured one.",
+        )
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent writer processes.")
+        parser.add_argument('--writes', type=int, default=200, help="Write transactions per worker.")
+        parser.add_argument(
+            '--baseline', action='store_true',
+            help="First run with driver defaults (no OPTIONS, no persistent connections) for comparison.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        writes = max(1, options['writes'])
+        try:
+            use_scratch_database(options['database'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        for name, value in describe_database():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(f"{workers} worker(s) x {writes} write transaction(s)\n")
+        rounds = [('baseline', True), ('configured', False)] if options['baseline'] else [('configured', False)]
+        try:
+            for label, baseline in rounds:
+                result = run_benchmark(workers, writes, baseline=baseline)
+                self.stdout.write(
+                    f"{label:>10}: {result['per_second']:8.1f} writes/s  "
+                    f"committed {result['committed']}  errors {result['errors']}  "
+                    f"p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  max {result['max_ms']:.1f} ms"
+                )
+        finally:
+            drop_tables()
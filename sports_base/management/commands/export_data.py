@@ -0,0 +1,49 @@
+import sys
+
+from django.core.exceptions import FieldError
+from django.core.management.base import BaseCommand, CommandError
+
+from sports_base.exports import EXPORTS, csv_lines, write_xlsx
+
+
+class Command(BaseCommand):
+    help = "Export players, teams, matches or users as CSV or XLSX without loading every row into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', '-o', help="File to write (default: standard output, CSV only).")
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='LOOKUP=VALUE',
+            help="Queryset filter, e.g. --filter sport__name=Cricket. May be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        spec = EXPORTS[options['dataset']]
+        filters = {}
+        for item in options['filter']:
+            lookup, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"Filters look like LOOKUP=VALUE, got '{item}'")
+            filters[lookup] = value
+        try:
+            queryset = spec.model._default_manager.filter(**filters).order_by('pk')
+        except FieldError as e:
+            raise CommandError(str(e))
+
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError("XLSX exports need --output")
+            try:
+                write_xlsx(spec, queryset, options['output'])
+            except ImportError:
+                raise CommandError("XLSX export needs openpyxl (pip install openpyxl)")
+            return
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in csv_lines(spec, queryset):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from sports_base.storage import HashedMediaStorage, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Recount media references and delete stored blobs that nothing refers to."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help="Keep unreferenced blobs stored more recently than this (uploads not yet saved to their rows).",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, HashedMediaStorage):
+            raise CommandError("The default storage is not HashedMediaStorage.")
+        removed, freed = collect_garbage(
+            timedelta(hours=options['grace_hours']), dry_run=options['dry_run'], storage=storage,
+        )
+        verb = "Would remove" if options['dry_run'] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} orphaned blob(s), {filesizeformat(freed)}."))
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from sports_base.jobs import claim_jobs, requeue_stale_jobs, run_job, worker_name
+
+
+def _init_process():
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (certificate previews, image derivatives, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=getattr(settings, 'JOB_WORKER_PROCESSES', 2),
+            help="Number of worker processes in the pool.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=getattr(settings, 'JOB_WORKER_POLL_INTERVAL', 2.0),
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit once no due jobs are left instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        worker = worker_name()
+        self.stdout.write(f"Job worker {worker} starting with {processes} process(es)")
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_process) as pool:
+            try:
+                while True:
+                    requeue_stale_jobs()
+                    job_ids = claim_jobs(processes * 2, worker)
+                    if not job_ids:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    # The pool forks on submit. Close this process's connections first,
+                    # so no child inherits (and on exit tears down) a live socket.
+                    connections.close_all()
+                    for job_id, status in zip(job_ids, pool.map(run_job, job_ids)):
+                        self.stdout.write(f"Job {job_id}: {status}")
+            except KeyboardInterrupt:
+                self.stdout.write("Job worker stopping")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from sports_base.perf import merged_report, reset_report
+
+
+class Command(BaseCommand):
+    help = "Print per-view latency and query figures collected by PerformanceMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=30, help="Number of views to show (busiest first).")
+        parser.add_argument('--reset', action='store_true', help="Clear the collected figures after printing.")
+
+    def handle(self, *args, **options):
+        rows = merged_report()[:options['limit']]
+        if not rows:
+            self.stdout.write("No requests recorded. Is PERF_MONITORING on and the cache shared between processes?")
+        else:
+            header = f"{'view':40} {'reqs':>6} {'over':>5} {'wall avg':>9} {'p95':>6} {'max':>8} {'queries':>8} {'q max':>6} {'db avg':>7} {'tpl avg':>8} {'size':>8}"
+            self.stdout.write(header)
+            self.stdout.write('-' * len(header))
+            for row in rows:
+                self.stdout.write(
+                    f"{row['view'][:40]:40} {row['requests']:>6} {row['over_budget']:>5} "
+                    f"{row['wall_ms_avg']:>9.1f} {format_bound(row['wall_ms_p95']):>6} {row['wall_ms_max']:>8.1f} "
+                    f"{row['queries_avg']:>8.1f} {row['queries_max']:>6} {row['db_ms_avg']:>7.1f} "
+                    f"{row['template_ms_avg']:>8.1f} {row['bytes_avg'] / 1024:>7.1f}K"
+                )
+        if options['reset']:
+            reset_report()
+            self.stdout.write(self.style.SUCCESS("Statistics cleared."))
+
+
+def format_bound(value):
+    return '>max' if value is None else str(value)
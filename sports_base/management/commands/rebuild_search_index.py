@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sports_base.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Refill the full-text search index from the database."
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError("The search index needs SQLite with FTS5; run migrate first.")
+        counts = rebuild_index()
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(counts.values())} documents."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from sports_base.standings import rebuild_standings
+
+
+class Command(BaseCommand):
+    help = "Recompute all league tables from match results."
+
+    def handle(self, *args, **options):
+        count = rebuild_standings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} standing row(s)."))
@@ -0,0 +1,26 @@
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from sports_base.storage import HashedMediaStorage, rehash_existing
+
+
+class Command(BaseCommand):
+    help = "Move media saved under upload names onto content-hash names, merging duplicates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Hash the files and report, changing nothing.")
+        parser.add_argument('--keep-originals', action='store_true', help="Leave the old files in place.")
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, HashedMediaStorage):
+            raise CommandError("The default storage is not HashedMediaStorage.")
+        rows, blobs, removed, missing = rehash_existing(
+            dry_run=options['dry_run'], keep_originals=options['keep_originals'], storage=storage,
+        )
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing} referenced file(s) are missing and were left as they are."))
+        verb = "Would point" if options['dry_run'] else "Pointed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {rows} row(s) at {blobs} blob(s); removed {removed} original file(s)."
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sports_base.jobs import worker_name
+from sports_base.mail import BATCH_SIZE, send_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox (password resets, approval notices, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Messages claimed per batch.")
+        parser.add_argument(
+            '--poll-interval', type=float, default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 5.0),
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument('--once', action='store_true', help="Send what is due and exit.")
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.stdout.write(f"Outbox sender {worker} starting")
+        try:
+            while True:
+                sent, failed = send_outbox(max(1, options['batch_size']), worker)
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent} email(s), {failed} failed")
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox sender stopping")
@@ -0,0 +1,130 @@
+"""
+Media serving.
+
+Django decides who may fetch a file; ``MEDIA_SERVER`` decides who sends it:
+
+* ``nginx``: an empty response with ``X-Accel-Redirect: MEDIA_ACCEL_PREFIX<name>``.
+  That location must be ``internal`` and alias ``MEDIA_ROOT``.
+* ``apache``: ``X-Sendfile`` with the absolute path (mod_xsendfile).
+* ``python`` (local runs): the worker streams the file itself through
+  ``RangedFileResponse``, so Range requests still get 206 answers.
+
+The front server then handles Range and keeps the Cache-Control,
+Content-Type and Content-Disposition set here.
+
+Public files under ``MEDIA_URL`` are cached for a year as immutable: their
+names are content hashes (``sports_base.storage``). Files under
+``PROTECTED_MEDIA_PREFIXES`` (certificates) are not served from
+``MEDIA_URL`` except to staff. Views that have checked ownership pass them
+to ``serve_media(..., private=True)``.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from ranged_response import RangedFileResponse
+
+PUBLIC_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def media_path(name):
+    """Absolute path of the media file ``name``; 404 if it is missing or outside ``MEDIA_ROOT``."""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid media path.')
+    if not os.path.isfile(path):
+        raise Http404('Media file not found.')
+    return path
+
+
+def is_protected(path):
+    """Whether the file at absolute ``path`` may only be served by an authorizing view."""
+    name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    return name.startswith(tuple(getattr(settings, 'PROTECTED_MEDIA_PREFIXES', ())))
+
+
+def _validators(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"', int(stat.st_mtime)
+
+
+def _range_applies(request, etag, last_modified):
+    """Honour ``If-Range``: a stale validator means the whole file is sent."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and since >= last_modified
+
+
+def _file_response(request, path, stat, etag, last_modified, content_type, as_attachment, filename):
+    if 'HTTP_RANGE' in request.META and _range_applies(request, etag, last_modified):
+        response = RangedFileResponse(
+            request, open(path, 'rb'), content_type=content_type, as_attachment=as_attachment, filename=filename,
+        )
+        if response.status_code == 416:
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    response = FileResponse(open(path, 'rb'), content_type=content_type, as_attachment=as_attachment, filename=filename)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _sendfile_response(path, name, content_type, as_attachment, filename):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVER == 'nginx':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    disposition = content_disposition_header(as_attachment, filename)
+    if disposition:
+        response['Content-Disposition'] = disposition
+    return response
+
+
+def serve_media(request, name, private=False, as_attachment=False, filename=None):
+    """
+    Respond with the media file ``name``. Callers authorize first; ``private``
+    keeps the file out of shared caches and makes browsers revalidate it.
+    """
+    path = media_path(name)
+    stat = os.stat(path)
+    etag, last_modified = _validators(stat)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        filename = filename or os.path.basename(path)
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if settings.MEDIA_SERVER == 'python':
+            response = _file_response(request, path, stat, etag, last_modified, content_type, as_attachment, filename)
+        else:
+            response = _sendfile_response(path, name, content_type, as_attachment, filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if private:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=PUBLIC_MAX_AGE, immutable=True)
+    return response
+
+
+@require_safe
+def public_media(request, path):
+    """
+    ``MEDIA_URL``. The front server normally answers public files first;
+    protected ones are only served here to staff, for the admin's file links.
+    """
+    if is_protected(media_path(path)):
+        if not request.user.is_staff:
+            raise Http404('Media file not found.')
+        return serve_media(request, path, private=True)
+    return serve_media(request, path)
@@ -0,0 +1,102 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+from .perf import stats, template_time
+
+logger = logging.getLogger('sports_base.perf')
+
+_template_timer_installed = False
+
+
+def install_template_timer():
+    """Time top-level template renders ({% include %}/{% extends %} are counted inside them)."""
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    _template_timer_installed = True
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        elapsed = template_time.get()
+        if elapsed is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            elapsed[0] += time.perf_counter() - start
+
+    Template.render = render
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def query_budget(view_name):
+    budgets = getattr(settings, 'PERF_QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'PERF_DEFAULT_QUERY_BUDGET', None))
+
+
+class PerformanceMiddleware:
+    """
+    Record wall time, queries, template time and response size per URL name.
+
+    Enabled with ``PERF_MONITORING = True``; otherwise Django drops it from
+    the stack. Views that run more queries than their ``PERF_QUERY_BUDGETS``
+    entry (or ``PERF_DEFAULT_QUERY_BUDGET``) log a warning.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_MONITORING', False):
+            raise MiddlewareNotUsed
+        install_template_timer()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        rendering = [0.0]
+        token = template_time.set(rendering)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            template_time.reset(token)
+        wall = time.perf_counter() - start
+
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        budget = query_budget(view_name)
+        over_budget = budget is not None and queries.count > budget
+        if over_budget:
+            logger.warning(f"{view_name} ran {queries.count} queries (budget {budget}) for {request.get_full_path()}")
+
+        size = 0 if response.streaming else len(response.content)
+        stats.record(
+            view_name,
+            wall_ms=wall * 1000,
+            db_ms=queries.duration * 1000,
+            template_ms=rendering[0] * 1000,
+            queries=queries.count,
+            bytes=size,
+            over_budget=over_budget,
+        )
+        return response
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 15:50
+
+from django.db import migrations, models
+
+
+def backfill_participant_names(apps, schema_editor):
+    MatchResult = apps.get_model('sports_base', 'MatchResult')
+    matches = MatchResult.objects.select_related('team1', 'team2', 'player1__user', 'player2__user')
+    for match in matches.iterator(chunk_size=500):
+        if match.team1 and match.team2:
+            names = (match.team1.name, match.team2.name)
+        elif match.player1 and match.player2:
+            names = (
+                f"{match.player1.user.first_name} {match.player1.user.last_name}",
+                f"{match.player2.user.first_name} {match.player2.user.last_name}",
+            )
+        else:
+            continue
+        MatchResult.objects.filter(pk=match.pk).update(participant1_name=names[0], participant2_name=names[1])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0009_certificate_preview'),
+        ('sports_base', '0007_imagevariantset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchresult',
+            name='participant1_name',
+            field=models.CharField(blank=True, editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='participant2_name',
+            field=models.CharField(blank=True, editable=False, max_length=201),
+        ),
+        migrations.AddIndex(
+            model_name='matchresult',
+            index=models.Index(fields=['sport', 'date'], name='match_sport_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchresult',
+            index=models.Index(fields=['status', 'date'], name='match_status_date_idx'),
+        ),
+        migrations.RunPython(backfill_participant_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 15:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0009_certificate_preview'),
+        ('sports_base', '0008_matchresult_participant_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveSmallIntegerField()),
+                ('played', models.IntegerField(default=0)),
+                ('won', models.IntegerField(default=0)),
+                ('drawn', models.IntegerField(default=0)),
+                ('lost', models.IntegerField(default=0)),
+                ('points_for', models.IntegerField(default=0)),
+                ('points_against', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('player', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='Sports_Users.player')),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='sports_base.sport')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='sports_base.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sport', 'season', '-points'], name='standing_table_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('team__isnull', False)), fields=('sport', 'season', 'team'), name='unique_team_standing'), models.UniqueConstraint(condition=models.Q(('player__isnull', False)), fields=('sport', 'season', 'player'), name='unique_player_standing')],
+            },
+        ),
+    ]
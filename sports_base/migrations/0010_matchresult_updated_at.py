@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports_base', '0009_standing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
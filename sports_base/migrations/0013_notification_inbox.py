@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 16:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0009_certificate_preview'),
+        ('sports_base', '0012_outboxemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationReadState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_read_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('read_until', models.DateTimeField(default=django.utils.timezone.now)),
+                ('read_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='notification_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_general', '-created_at'], name='notification_general_idx'),
+        ),
+    ]
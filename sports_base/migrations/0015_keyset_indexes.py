@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 16:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Sports_Users', '0009_certificate_preview'),
+        ('sports_base', '0014_notificationbroadcast'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coach',
+            index=models.Index(fields=['name', 'id'], name='coach_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'id'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchresult',
+            index=models.Index(fields=['date', 'id'], name='match_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sportschedule',
+            index=models.Index(fields=['uploaded_at', 'id'], name='schedule_uploaded_idx'),
+        ),
+    ]
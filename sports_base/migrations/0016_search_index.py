@@ -0,0 +1,32 @@
+from django.db import migrations, OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases use the icontains fallback in sports_base.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, url UNINDEXED, audience UNINDEXED, title, body, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    except OperationalError:
+        # SQLite built without FTS5
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports_base', '0015_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
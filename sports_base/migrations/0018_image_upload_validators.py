@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 16:27
+
+import sports_base.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sports_base', '0017_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='coach',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, upload_to='coaches/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='sport',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='sports_images/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='sportgallery',
+            name='image',
+            field=models.ImageField(upload_to='sports_gallery/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='sportschedule',
+            name='image',
+            field=models.ImageField(upload_to='schedules/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='team',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, upload_to='team_logos/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+    ]
@@ -2,12 +2,15 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .uploads import validate_image_upload
+
 User = get_user_model()
 
 class SportGallery(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
-    image = models.ImageField(upload_to='sports_gallery/')
+    image = models.ImageField(upload_to='sports_gallery/', validators=[validate_image_upload])
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
@@ -15,8 +18,14 @@ class SportGallery(models.Model):
 class SportSchedule(models.Model):
     title = models.CharField(max_length=100)
     season = models.CharField(max_length=100)
-    image = models.ImageField(upload_to='schedules/')
+    image = models.ImageField(upload_to='schedules/', validators=[validate_image_upload])
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['uploaded_at', 'id'], name='schedule_uploaded_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.season})"
@@ -34,7 +43,8 @@ class Feedback(models.Model):
 
 class Sport(models.Model):
     name = models.CharField(max_length=100, unique=True)
-    image = models.ImageField(upload_to='sports_images/', null=True, blank=True)
+    image = models.ImageField(upload_to='sports_images/', null=True, blank=True, validators=[validate_image_upload])
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -50,7 +60,12 @@ class Coach(models.Model):
     designation = models.CharField(max_length=100, choices=DESIGNATION_CHOICES, default='coach')
     experience_years = models.PositiveIntegerField()
     sports = models.ManyToManyField(Sport, related_name='coaches')  # Changed to ManyToManyField
-    photo = models.ImageField(upload_to='coaches/', null=True, blank=True)
+    photo = models.ImageField(upload_to='coaches/', null=True, blank=True, validators=[validate_image_upload])
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='coach_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {', '.join(sport.name for sport in self.sports.all())}"
@@ -66,8 +81,9 @@ class Team(models.Model):
     sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name='teams')
     players = models.ManyToManyField('Sports_Users.Player', related_name='teams')
     coach = models.ForeignKey(Coach, on_delete=models.SET_NULL, null=True, related_name='teams')
-    logo = models.ImageField(upload_to='team_logos/', null=True, blank=True)
+    logo = models.ImageField(upload_to='team_logos/', null=True, blank=True, validators=[validate_image_upload])
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.sport.name}"
@@ -96,6 +112,17 @@ class MatchResult(models.Model):
         ('draw', 'Match Draw'),
         ('pending', 'Result Pending')
     ], default='pending')
+    # Denormalized display names, refreshed on save so listings never walk the relations
+    participant1_name = models.CharField(max_length=201, blank=True, editable=False)
+    participant2_name = models.CharField(max_length=201, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sport', 'date'], name='match_sport_date_idx'),
+            models.Index(fields=['status', 'date'], name='match_status_date_idx'),
+            models.Index(fields=['date', 'id'], name='match_date_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if self.status == 'completed':
@@ -111,27 +138,48 @@ class MatchResult(models.Model):
                     self.result = 'player2_win'
             else:
                 self.result = 'draw'
+        self.refresh_participant_names()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'participant1_name', 'participant2_name', 'updated_at'}
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def player_display_name(player):
+        return f"{player.user.first_name} {player.user.last_name}"
+
+    def refresh_participant_names(self):
+        if self.team1 and self.team2:
+            self.participant1_name = self.team1.name
+            self.participant2_name = self.team2.name
+        elif self.player1 and self.player2:
+            self.participant1_name = self.player_display_name(self.player1)
+            self.participant2_name = self.player_display_name(self.player2)
+        else:
+            self.participant1_name = self.participant2_name = ''
+
+    @property
+    def winning_side(self):
+        """1 or 2 for the winning participant, None for a draw or pending result."""
+        if self.result in ('team1_win', 'player1_win'):
+            return 1
+        if self.result in ('team2_win', 'player2_win'):
+            return 2
+        return None
+
     def get_result_display_text(self):
         if self.status != 'completed':
             return 'Match not completed'
-        if self.result == 'team1_win':
-            return f'{self.team1.name} Won'
-        elif self.result == 'team2_win':
-            return f'{self.team2.name} Won'
-        elif self.result == 'player1_win':
-            return f'{self.player1.user.first_name} {self.player1.user.last_name} Won'
-        elif self.result == 'player2_win':
-            return f'{self.player2.user.first_name} {self.player2.user.last_name} Won'
+        if self.result in ('team1_win', 'player1_win'):
+            return f'{self.participant1_name} Won'
+        elif self.result in ('team2_win', 'player2_win'):
+            return f'{self.participant2_name} Won'
         else:
             return 'Match Draw'
 
     def get_participants_display(self):
-        if self.team1 and self.team2:
-            return f"{self.team1.name} vs {self.team2.name}"
-        elif self.player1 and self.player2:
-            return f"{self.player1.user.first_name} {self.player1.user.last_name} vs {self.player2.user.first_name} {self.player2.user.last_name}"
+        if self.participant1_name and self.participant2_name:
+            return f"{self.participant1_name} vs {self.participant2_name}"
         return "Invalid Match"
 
     def __str__(self):
@@ -142,16 +190,209 @@ class Event(models.Model):
     date = models.DateTimeField(default=timezone.now)
     location = models.CharField(max_length=255)
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='event_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+class NotificationBroadcast(models.Model):
+    """One notification sent to a group of players; a ``Notification`` row is created per recipient."""
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True)
+    target = models.CharField(max_length=255, blank=True)
+    sent_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    recipient_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} - {self.target}"
+
 class Notification(models.Model):
     title = models.CharField(max_length=255)
     message = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Edits move it too; the notification list's ETag is built from its MAX
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_general = models.BooleanField(default=False)
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    broadcast = models.ForeignKey(NotificationBroadcast, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notification_recipient_idx'),
+            models.Index(fields=['is_general', '-created_at'], name='notification_general_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {'General' if self.is_general else self.recipient.username}"
+
+
+class NotificationReadState(models.Model):
+    """
+    What a user has read: every notification created up to ``read_until``,
+    plus the ids in ``read_ids`` (read one by one since then).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_read_state')
+    read_until = models.DateTimeField(default=timezone.now)
+    read_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def is_read(self, notification):
+        return notification.created_at <= self.read_until or notification.id in self.read_ids
+
+    def __str__(self):
+        return f"Read state of {self.user}"
+
+class Job(models.Model):
+    """Unit of background work picked up by ``manage.py jobworker``."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    kind = models.CharField(max_length=50)
+    object_key = models.CharField(max_length=100, blank=True)
+    version = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_key', 'version'], name='unique_job_per_object_version'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_key} ({self.status})"
+
+
+class ImageVariantSet(models.Model):
+    """Resized copies of one uploaded image, built by ``sports_base.images``."""
+    source = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    variants = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.source
+
+
+class Standing(models.Model):
+    """One row of a sport's league table for a season, maintained by ``sports_base.standings``."""
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name='standings')
+    season = models.PositiveSmallIntegerField()
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name='standings')
+    player = models.ForeignKey('Sports_Users.Player', on_delete=models.CASCADE, null=True, blank=True, related_name='standings')
+    played = models.IntegerField(default=0)
+    won = models.IntegerField(default=0)
+    drawn = models.IntegerField(default=0)
+    lost = models.IntegerField(default=0)
+    points_for = models.IntegerField(default=0)
+    points_against = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sport', 'season', 'team'], condition=models.Q(team__isnull=False),
+                name='unique_team_standing',
+            ),
+            models.UniqueConstraint(
+                fields=['sport', 'season', 'player'], condition=models.Q(player__isnull=False),
+                name='unique_player_standing',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['sport', 'season', '-points'], name='standing_table_idx'),
+        ]
+
+    @property
+    def participant_name(self):
+        if self.team_id:
+            return self.team.name
+        return f"{self.player.user.first_name} {self.player.user.last_name}"
+
+    @property
+    def point_difference(self):
+        return self.points_for - self.points_against
+
+    def __str__(self):
+        return f"{self.participant_name} - {self.sport.name} {self.season}"
+
+
+class OutboxEmail(models.Model):
+    """Email written by ``sports_base.mail.OutboxBackend`` and delivered by ``manage.py send_outbox``."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=6)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='outbox_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class MediaBlob(models.Model):
+    """One content-addressed file of ``sports_base.storage.HashedMediaStorage``."""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    # File fields naming this blob; kept by signals and recounted by `manage.py gc_media`
+    refcount = models.PositiveIntegerField(default=0)
+    # Last upload of this content; `gc_media` spares blobs stored within its grace period
+    stored_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.title} - {'General' if self.is_general else self.recipient.username}"
\ No newline at end of file
+        return f"{self.name} ({self.refcount} ref(s))"
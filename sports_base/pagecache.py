@@ -0,0 +1,138 @@
+"""
+Response caching for public, read-heavy pages.
+
+``@cache_public_page(Model, ...)`` caches a view's response for anonymous
+GET requests, keyed by path, the query parameters the page uses and the
+active language. Each model has a generation counter in the cache; saving or
+deleting a row of a model bumps its counter, which retires every cached page
+that depends on it.
+
+The cache alias is ``PAGE_CACHE_ALIAS`` (``default`` by default). With
+several gunicorn workers use a shared backend (file or Redis): a locmem cache
+is per process, so other workers would keep serving pages until they expire.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.translation import get_language
+
+PAGE_CACHE_ALIAS = getattr(settings, 'PAGE_CACHE_ALIAS', 'default')
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 10)
+GENERATION_TIMEOUT = None  # generation counters never expire on their own
+
+_watched = set()
+
+
+def page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def _generation_key(model):
+    return f'pagecache:gen:{model._meta.label_lower}'
+
+
+def invalidate_model(model):
+    """Retire every cached page that depends on ``model``."""
+    cache = page_cache()
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), GENERATION_TIMEOUT)
+
+
+def _on_change(sender, **kwargs):
+    invalidate_model(sender)
+
+
+def _on_m2m_change(sender, action, instance, model, **kwargs):
+    if action.startswith('post_'):
+        invalidate_model(type(instance))
+        invalidate_model(model)
+
+
+def watch_model(model):
+    """Invalidate pages depending on ``model`` when its rows or M2M links change."""
+    if model in _watched:
+        return
+    _watched.add(model)
+    uid = f'pagecache:{model._meta.label_lower}'
+    post_save.connect(_on_change, sender=model, dispatch_uid=uid)
+    post_delete.connect(_on_change, sender=model, dispatch_uid=uid)
+    for field in model._meta.local_many_to_many:
+        m2m_changed.connect(_on_m2m_change, sender=field.remote_field.through, dispatch_uid=f'{uid}.{field.name}')
+
+
+def _generations(models):
+    cache = page_cache()
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    missing = [key for key in keys if key not in generations]
+    if missing:
+        # Start (or restart, after an eviction) from a fresh value so pages
+        # cached under an older counter can never match again.
+        for key in missing:
+            cache.add(key, time.time_ns(), GENERATION_TIMEOUT)
+        generations.update(cache.get_many(missing))
+    return generations
+
+
+def generation_tag(*models):
+    """A string that changes whenever a row of one of ``models`` (watched with ``watch_model``) changes."""
+    generations = _generations(models)
+    return '|'.join(f"{model._meta.label_lower}:{generations.get(_generation_key(model), 0)}" for model in models)
+
+
+def _page_key(request, models, vary_on):
+    parts = [
+        request.path,
+        get_language() or '',
+        *(f"{param}={request.GET.get(param, '')}" for param in vary_on),
+        generation_tag(*models),
+    ]
+    return 'pagecache:page:' + hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Pending flash messages would be baked into the page
+    return not len(get_messages(request))
+
+
+def cache_public_page(*models, vary_on=('page', 'sport'), timeout=None):
+    """
+    Cache the decorated view for anonymous visitors until one of ``models`` changes.
+
+    ``vary_on`` lists the query parameters that select different content;
+    other parameters do not create new cache entries.
+    """
+    for model in models:
+        watch_model(model)
+    timeout = PAGE_CACHE_TIMEOUT if timeout is None else timeout
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            cache = page_cache()
+            key = _page_key(request, models, vary_on)
+            response = cache.get(key)
+            if response is not None:
+                return response
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+                cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
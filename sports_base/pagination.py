@@ -0,0 +1,196 @@
+"""
+Keyset (seek) pagination.
+
+``KeysetPaginator(queryset, per_page, ordering)`` pages through ``queryset``
+by filtering past the last row shown instead of using OFFSET, so a deep
+page costs the same as the first one. ``ordering`` names the fields to sort
+on; the primary key is appended as a tie-breaker, and every field must be
+non-null. Pages are addressed by opaque cursors passed in ``?page=``. The
+queryset may return ``values()`` dicts as long as they include those fields.
+
+``KeysetPage`` implements the parts of Django's ``Page`` the templates use.
+Its "page numbers" are cursors, so ``?page={{ page_obj.next_page_number }}``
+links keep working, and ``number`` still counts pages from the first one.
+No ``COUNT`` is run unless ``estimate_count=True``: then the total comes
+from PostgreSQL's planner statistics for an unfiltered table, or from an
+exact count cached until the model changes.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import math
+from datetime import date, datetime, time
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .pagecache import PAGE_CACHE_TIMEOUT, generation_tag, page_cache, watch_model
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def _dump(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, number=1, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page, ordering=('-pk',), estimate_count=False):
+        opts = queryset.model._meta
+        self.keys = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            self.keys.append((field, descending))
+        if not any(field.primary_key for field, _ in self.keys):
+            self.keys.append((opts.pk, self.keys[-1][1] if self.keys else True))
+        self.queryset = queryset
+        self.per_page = per_page
+        self.estimate_count = estimate_count
+        self._pages_seen = 1
+        if estimate_count:
+            watch_model(queryset.model)
+
+    def _ordering(self, reverse=False):
+        return ['-' + field.name if descending != reverse else field.name for field, descending in self.keys]
+
+    def _seek(self, values, reverse=False):
+        """Rows after ``values`` in the paginator's ordering (before them with ``reverse``)."""
+        clauses = []
+        for index, (field, descending) in enumerate(self.keys):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {earlier.name: value for (earlier, _), value in zip(self.keys[:index], values)}
+            clauses.append(Q(**equal, **{f'{field.name}__{lookup}': values[index]}))
+        return reduce(or_, clauses)
+
+    def encode_cursor(self, obj, direction, number):
+        # Rows are model instances, or dicts from values() that include every key's attname
+        if isinstance(obj, dict):
+            values = [_dump(obj[field.attname]) for field, _ in self.keys]
+        else:
+            values = [_dump(getattr(obj, field.attname)) for field, _ in self.keys]
+        raw = json.dumps([direction, number, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return ``(direction, number, values)`` from a cursor, or None if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, number, values = json.loads(raw)
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.keys):
+                return None
+            return direction, max(int(number), 1), [field.to_python(value) for (field, _), value in zip(self.keys, values)]
+        except (TypeError, ValueError, ValidationError, binascii.Error, UnicodeDecodeError):
+            return None
+
+    def get_page(self, cursor=None):
+        """The page ``cursor`` points at; the first page for a missing, malformed or stale cursor."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self._ordering())[:self.per_page + 1])
+            number, more_before, more_after = 1, False, len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        else:
+            direction, number, values = decoded
+            reverse = direction == PREVIOUS
+            rows = list(self.queryset.filter(self._seek(values, reverse)).order_by(*self._ordering(reverse))[:self.per_page + 1])
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            if not rows:
+                return self.get_page()
+            if reverse:
+                rows.reverse()
+                more_before, more_after = more, True
+                if not more_before:
+                    number = 1
+            else:
+                more_before, more_after = True, more
+        self._pages_seen = max(self._pages_seen, number + more_after)
+        return KeysetPage(
+            rows,
+            self,
+            number=number,
+            next_cursor=self.encode_cursor(rows[-1], NEXT, number + 1) if more_after else None,
+            previous_cursor=self.encode_cursor(rows[0], PREVIOUS, number - 1) if more_before else None,
+        )
+
+    def _planner_estimate(self):
+        connection = connections[self.queryset.db]
+        if connection.vendor != 'postgresql' or self.queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [self.queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 until the table has been analyzed
+        return int(row[0]) if row and row[0] >= 0 else None
+
+    @cached_property
+    def count(self):
+        """Estimated number of rows, or None when counting is off."""
+        if not self.estimate_count:
+            return None
+        estimate = self._planner_estimate()
+        if estimate is not None:
+            return estimate
+        sql, params = self.queryset.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params}|{generation_tag(self.queryset.model)}".encode('utf-8')).hexdigest()
+        key = f'pagination:count:{digest}'
+        cache = page_cache()
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, PAGE_CACHE_TIMEOUT)
+        return count
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        # An estimate can trail the pages actually seen
+        return max(math.ceil(self.count / self.per_page), self._pages_seen)
@@ -0,0 +1,155 @@
+"""
+Per-view performance statistics.
+
+``PerformanceMiddleware`` records wall time, database queries and time,
+template render time and response size for every request, keyed by the
+resolved URL name. Numbers are aggregated in memory into fixed-bucket
+histograms and copied to the cache every few seconds, so ``manage.py
+perfreport`` and the staff page can merge the figures of every worker
+process (this needs a shared cache backend, see CACHE_BACKEND).
+"""
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Upper bounds of the histogram buckets: milliseconds for times, counts for queries.
+TIME_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    'wall_ms': TIME_BUCKETS,
+    'db_ms': TIME_BUCKETS,
+    'template_ms': TIME_BUCKETS,
+    'queries': QUERY_BUCKETS,
+    'bytes': (1024, 10240, 51200, 102400, 512000, 1048576),
+}
+
+FLUSH_INTERVAL = getattr(settings, 'PERF_FLUSH_INTERVAL', 10)
+PROCESS_KEY = 'perf:process:{}'
+PROCESS_INDEX_KEY = 'perf:processes'
+EPOCH_KEY = 'perf:epoch'  # changed by reset_report(); processes drop their figures when it moves
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Template render time of the request being handled on this thread/task.
+template_time = ContextVar('perf_template_time', default=None)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        return {'counts': self.counts, 'total': self.total, 'max': self.max}
+
+
+class PerfStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._last_flush = 0
+        self._epoch = None
+
+    def record(self, view_name, **values):
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = {
+                    'requests': 0,
+                    'over_budget': 0,
+                    **{metric: Histogram(bounds) for metric, bounds in METRICS.items()},
+                }
+            view['requests'] += 1
+            if values.pop('over_budget', False):
+                view['over_budget'] += 1
+            for metric, value in values.items():
+                view[metric].add(value)
+        if time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {key: value.to_dict() if isinstance(value, Histogram) else value for key, value in view.items()}
+                for name, view in self._views.items()
+            }
+
+    def flush(self):
+        """Publish this process's figures to the cache for other processes to read."""
+        self._last_flush = time.monotonic()
+        epoch = cache.get(EPOCH_KEY)
+        if epoch != self._epoch:
+            if self._epoch is not None or epoch is not None:
+                self.reset()
+            self._epoch = epoch
+        process = f"{socket.gethostname()}:{os.getpid()}"
+        cache.set(PROCESS_KEY.format(process), self.snapshot(), CACHE_TIMEOUT)
+        processes = cache.get(PROCESS_INDEX_KEY) or []
+        if process not in processes:
+            cache.set(PROCESS_INDEX_KEY, processes + [process], CACHE_TIMEOUT)
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+stats = PerfStats()
+
+
+def merged_report():
+    """Merge the published figures of every process, busiest views first."""
+    merged = {}
+    for process in cache.get(PROCESS_INDEX_KEY) or []:
+        for name, view in (cache.get(PROCESS_KEY.format(process)) or {}).items():
+            target = merged.setdefault(name, {'requests': 0, 'over_budget': 0})
+            target['requests'] += view['requests']
+            target['over_budget'] += view['over_budget']
+            for metric, bounds in METRICS.items():
+                hist = target.setdefault(metric, {'counts': [0] * (len(bounds) + 1), 'total': 0, 'max': 0})
+                hist['counts'] = [a + b for a, b in zip(hist['counts'], view[metric]['counts'])]
+                hist['total'] += view[metric]['total']
+                hist['max'] = max(hist['max'], view[metric]['max'])
+
+    rows = []
+    for name, view in merged.items():
+        requests = view['requests']
+        row = {'view': name, 'requests': requests, 'over_budget': view['over_budget']}
+        for metric, bounds in METRICS.items():
+            row[f'{metric}_avg'] = view[metric]['total'] / requests
+            row[f'{metric}_p95'] = percentile(view[metric]['counts'], bounds, 0.95)
+            row[f'{metric}_max'] = view[metric]['max']
+        rows.append(row)
+    rows.sort(key=lambda row: row['wall_ms_avg'] * row['requests'], reverse=True)
+    return rows
+
+
+def percentile(counts, bounds, fraction):
+    """Upper bucket bound under which ``fraction`` of the samples fall (None if unbounded)."""
+    target = sum(counts) * fraction
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if count and seen >= target:
+            return bounds[index] if index < len(bounds) else None
+    return None
+
+
+def reset_report():
+    for process in cache.get(PROCESS_INDEX_KEY) or []:
+        cache.delete(PROCESS_KEY.format(process))
+    cache.delete(PROCESS_INDEX_KEY)
+    cache.set(EPOCH_KEY, time.time_ns(), None)
+    stats.reset()
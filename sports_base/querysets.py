@@ -0,0 +1,33 @@
+"""
+Shared prefetch helpers.
+
+Pages that list teams with their rosters, coaches and achievements should
+build their querysets here so every relation the templates touch is loaded
+up front: a constant number of queries no matter how many teams or players
+there are.
+"""
+from django.db.models import Prefetch
+
+from Sports_Users.models import Player
+
+from .models import Team
+
+
+def roster_queryset():
+    """Players with the user and sport each roster line prints."""
+    return Player.objects.select_related('user', 'sport')
+
+
+def roster_prefetch(to_attr=None):
+    """Prefetch Team -> players -> user/sport in one query."""
+    return Prefetch('players', queryset=roster_queryset(), to_attr=to_attr)
+
+
+def teams_with_roster(queryset=None):
+    """
+    Teams with sport, coach (and the coach's user), players (with their user
+    and sport) and achievements loaded: four queries for any number of teams.
+    """
+    if queryset is None:
+        queryset = Team.objects.all()
+    return queryset.select_related('sport', 'coach__user').prefetch_related(roster_prefetch(), 'achievements')
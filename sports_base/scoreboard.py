@@ -0,0 +1,31 @@
+"""
+Scoreboard queries.
+
+Matches are listed newest first and paginated by seeking on (date, id) with
+``KeysetPaginator``, so deep pages cost the same as the first one.
+Participant names come from the denormalized columns on MatchResult, so
+rendering a page needs no per-row relation lookups.
+"""
+from .models import MatchResult
+from .pagination import KeysetPaginator
+
+SCOREBOARD_PAGE_SIZE = 24
+
+SCOREBOARD_FIELDS = (
+    'id', 'sport__name', 'team1', 'team2', 'participant1_name', 'participant2_name',
+    'score1', 'score2', 'date', 'location', 'status', 'result',
+)
+
+
+def scoreboard_queryset(sport_id=None, status=None):
+    matches = MatchResult.objects.select_related('sport').only(*SCOREBOARD_FIELDS)
+    if sport_id:
+        matches = matches.filter(sport_id=sport_id)
+    if status:
+        matches = matches.filter(status=status)
+    return matches
+
+
+def scoreboard_page(queryset, page=None, per_page=SCOREBOARD_PAGE_SIZE):
+    """One page of ``queryset``, newest first; ``page`` is a cursor from a previous page."""
+    return KeysetPaginator(queryset, per_page, ordering=('-date',)).get_page(page)
@@ -0,0 +1,356 @@
+"""
+Full-text search.
+
+Searchable rows are copied into ``search_index``, an SQLite FTS5 table
+created by migration 0016. Signals keep it in step (``connect_search_signals``),
+and ``manage.py rebuild_search_index`` refills it from scratch. Each document
+has a title, a body, the URL it links to and an audience: ``public``,
+``members`` (logged-in users), ``staff`` or ``user:<id>``.
+
+A document's rowid is ``pk * KIND_SLOTS + kind code``, so replacing or
+removing one is a rowid lookup rather than a table scan. On databases
+without FTS5 the site search falls back to ``icontains`` over the same
+fields, and the admin keeps its own ``search_fields``.
+"""
+import re
+
+from django.apps import apps
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+KIND_SLOTS = 8
+INDEX_BATCH_SIZE = 500
+RESULTS_LIMIT = 50
+MAX_TERMS = 8
+# Markers passed to highlight()/snippet(); swapped for <mark> after escaping
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+_available = {}
+
+
+class SearchSource:
+    """How rows of one model become documents: title and body lookups, audience and link."""
+    def __init__(self, kind, code, label, model, title, body, audience='public', url=None, extra=()):
+        self.kind = kind
+        self.code = code
+        self.label = label
+        self.model_label = model
+        self.title = title
+        self.body = body
+        self.audience = audience
+        self.url = url
+        self.extra = extra
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def rowid(self, pk):
+        return pk * KIND_SLOTS + self.code
+
+    def documents(self, queryset):
+        """Yield ``(rowid, kind, object_id, url, audience, title, body)`` for each row of ``queryset``."""
+        lookups = ('pk', *self.title, *self.body, *self.extra)
+        for row in queryset.order_by().values(*lookups).iterator(chunk_size=INDEX_BATCH_SIZE):
+            audience = self.audience(row) if callable(self.audience) else self.audience
+            yield (
+                self.rowid(row['pk']),
+                self.kind,
+                row['pk'],
+                self.url(row),
+                audience,
+                _join(row, self.title),
+                _join(row, self.body),
+            )
+
+    def matching(self, text):
+        """Fallback filter: every term must appear in one of the source's fields."""
+        condition = Q()
+        for term in search_terms(text):
+            term_condition = Q()
+            for lookup in (*self.title, *self.body):
+                term_condition |= Q(**{f'{lookup}__icontains': term})
+            condition &= term_condition
+        return self.model._default_manager.filter(condition)
+
+
+def _join(row, lookups):
+    return ' '.join(str(row[lookup]) for lookup in lookups if row[lookup] not in (None, ''))
+
+
+def _teams_url(row, sport_lookup):
+    return f"{reverse('static_pages:teams')}?sport={row[sport_lookup]}"
+
+
+SOURCES = [
+    SearchSource(
+        'event', 1, 'Event', 'sports_base.Event', ('title',), ('location', 'description'),
+        url=lambda row: reverse('sports_base:events'),
+    ),
+    SearchSource(
+        'gallery', 2, 'Gallery', 'sports_base.SportGallery', ('title',), ('description',),
+        url=lambda row: reverse('sports_base:sports_gallery'),
+    ),
+    SearchSource(
+        'coach', 3, 'Coach', 'sports_base.Coach', ('name',), ('designation',),
+        url=lambda row: reverse('sports_base:coach_profile'),
+    ),
+    SearchSource(
+        'team', 4, 'Team', 'sports_base.Team', ('name',), ('sport__name', 'coach__name'),
+        audience='members', extra=('sport_id',), url=lambda row: _teams_url(row, 'sport_id'),
+    ),
+    SearchSource(
+        'achievement', 5, 'Achievement', 'static_pages.Achievements', ('team__name',), ('description',),
+        audience='members', extra=('team__sport_id',), url=lambda row: _teams_url(row, 'team__sport_id'),
+    ),
+    SearchSource(
+        'notification', 6, 'Notification', 'sports_base.Notification', ('title',), ('message',),
+        audience=lambda row: 'members' if row['is_general'] else f"user:{row['recipient_id']}",
+        extra=('is_general', 'recipient_id'), url=lambda row: reverse('sports_base:notification_list'),
+    ),
+    SearchSource(
+        'player', 7, 'Player', 'Sports_Users.Player', ('user__first_name', 'user__last_name'),
+        ('user__email', 'user__cnic', 'father_name', 'college_roll_no', 'city', 'sport__name'),
+        audience='staff', url=lambda row: reverse('admin:Sports_Users_player_change', args=[row['pk']]),
+    ),
+]
+
+SOURCES_BY_KIND = {source.kind: source for source in SOURCES}
+
+
+def search_available():
+    """Whether the FTS5 index exists in the default database."""
+    name = connection.settings_dict['NAME']
+    if name not in _available:
+        _available[name] = connection.vendor == 'sqlite' and 'search_index' in connection.introspection.table_names()
+    return _available[name]
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text or '')[:MAX_TERMS]
+
+
+def fts_query(text):
+    """An FTS5 query matching every term of ``text`` as a prefix; None when there are no terms."""
+    terms = search_terms(text)
+    return ' '.join(f'"{term}"*' for term in terms) or None
+
+
+def _write(rowids, documents):
+    with connection.cursor() as cursor:
+        cursor.executemany('DELETE FROM search_index WHERE rowid = %s', [(rowid,) for rowid in rowids])
+        cursor.executemany(
+            'INSERT INTO search_index (rowid, kind, object_id, url, audience, title, body) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+            documents,
+        )
+
+
+def index_objects(kind, pks):
+    """Refresh the documents of ``kind`` for ``pks``; rows that no longer exist are dropped."""
+    pks = list(pks)
+    if not pks or not search_available():
+        return
+    source = SOURCES_BY_KIND[kind]
+    documents = list(source.documents(source.model._default_manager.filter(pk__in=pks)))
+    _write([source.rowid(pk) for pk in pks], documents)
+
+
+def index_queryset(kind, queryset):
+    """Refresh the documents for every row of ``queryset``, in batches; return how many were written."""
+    if not search_available():
+        return 0
+    source = SOURCES_BY_KIND[kind]
+    count = 0
+    batch = []
+    for document in source.documents(queryset):
+        batch.append(document)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            _write([document[0] for document in batch], batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        _write([document[0] for document in batch], batch)
+        count += len(batch)
+    return count
+
+
+def remove_objects(kind, pks):
+    if not search_available():
+        return
+    source = SOURCES_BY_KIND[kind]
+    _write([source.rowid(pk) for pk in pks], [])
+
+
+def rebuild_index():
+    """Empty and refill the index; return ``{kind: documents}``."""
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM search_index')
+    counts = {source.kind: index_queryset(source.kind, source.model._default_manager.all()) for source in SOURCES}
+    with connection.cursor() as cursor:
+        cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    return counts
+
+
+def audiences_for(user):
+    """Audiences ``user`` may see; None means everything (staff)."""
+    if user is None or not user.is_authenticated:
+        return ['public']
+    if user.is_staff:
+        return None
+    return ['public', 'members', f'user:{user.pk}']
+
+
+def _marked(text):
+    return mark_safe(escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+class SearchResult:
+    def __init__(self, kind, object_id, url, title, snippet):
+        self.kind = kind
+        self.object_id = object_id
+        self.url = url
+        self.title = title
+        self.snippet = snippet
+
+    @property
+    def label(self):
+        return SOURCES_BY_KIND[self.kind].label
+
+
+def search_documents(text, user=None, kinds=None, limit=RESULTS_LIMIT):
+    """Best matches for ``text`` that ``user`` may see, with matched terms wrapped in <mark>."""
+    query = fts_query(text)
+    if query is None:
+        return []
+    audiences = audiences_for(user)
+    if not search_available():
+        return _fallback_search(text, audiences, kinds, limit)
+    sql = (
+        'SELECT kind, object_id, url, highlight(search_index, 4, %s, %s), '
+        "snippet(search_index, 5, %s, %s, '…', 16) "
+        'FROM search_index WHERE search_index MATCH %s'
+    )
+    params = [MARK_START, MARK_END, MARK_START, MARK_END, query]
+    if audiences is not None:
+        sql += f" AND audience IN ({', '.join(['%s'] * len(audiences))})"
+        params += audiences
+    if kinds:
+        sql += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+        params += list(kinds)
+    # Title matches weigh ten times body matches
+    sql += ' ORDER BY bm25(search_index, 0, 0, 0, 0, 10.0, 1.0) LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(sql, params)
+        except OperationalError:
+            return []
+        rows = cursor.fetchall()
+    return [
+        SearchResult(kind, object_id, url, _marked(title), _marked(snippet))
+        for kind, object_id, url, title, snippet in rows
+    ]
+
+
+def _fallback_search(text, audiences, kinds, limit):
+    results = []
+    for source in SOURCES:
+        if kinds and source.kind not in kinds:
+            continue
+        for _, kind, object_id, url, audience, title, body in source.documents(source.matching(text)[:limit]):
+            if audiences is None or audience in audiences:
+                results.append(SearchResult(kind, object_id, url, title, body[:200]))
+    return results[:limit]
+
+
+class IndexedSearchMixin:
+    """
+    ModelAdmin mixin: changelist searches go through the index for ``search_kind``.
+    ``search_fields`` the document does not carry (a coach's email, say) still
+    match as the admin's own search would, and either match counts.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        query = fts_query(search_term)
+        if query is None or not search_available():
+            return super().get_search_results(request, queryset, search_term)
+        matches = RawSQL(
+            'SELECT object_id FROM search_index WHERE search_index MATCH %s AND kind = %s',
+            (query, self.search_kind),
+        )
+        source = SOURCES_BY_KIND[self.search_kind]
+        indexed = {*source.title, *source.body}
+        unindexed = [field for field in self.get_search_fields(request) if field not in indexed]
+        if not unindexed:
+            return queryset.filter(pk__in=matches), False
+        condition = Q()
+        for term in search_terms(search_term):
+            term_condition = Q()
+            for field in unindexed:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        may_have_duplicates = any(lookup_spawns_duplicates(self.opts, field) for field in unindexed)
+        return queryset.filter(Q(pk__in=matches) | condition), may_have_duplicates
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & set(fields))
+
+
+def _reindex_receiver(kind):
+    source = SOURCES_BY_KIND[kind]
+    fields = {lookup.split('__')[0] for lookup in (*source.title, *source.body, *source.extra)}
+
+    def receiver(sender, instance, update_fields=None, **kwargs):
+        if _touches(update_fields, fields):
+            index_objects(kind, [instance.pk])
+    return receiver
+
+
+def _remove_receiver(kind):
+    def receiver(sender, instance, **kwargs):
+        remove_objects(kind, [instance.pk])
+    return receiver
+
+
+def _dependent_receiver(kind, lookup, fields):
+    """Reindex documents of ``kind`` whose text includes ``fields`` of the saved instance."""
+    def receiver(sender, instance, created=False, update_fields=None, **kwargs):
+        if created or not _touches(update_fields, fields):
+            return
+        source = SOURCES_BY_KIND[kind]
+        index_queryset(kind, source.model._default_manager.filter(**{lookup: instance.pk}))
+    return receiver
+
+
+# (kind, model, lookup from the document's model to it, fields of it the document uses)
+DEPENDENT_SOURCES = [
+    ('player', 'Sports_Users.CustomUser', 'user', ('first_name', 'last_name', 'email', 'cnic')),
+    ('player', 'sports_base.Sport', 'sport', ('name',)),
+    ('team', 'sports_base.Sport', 'sport', ('name',)),
+    ('team', 'sports_base.Coach', 'coach', ('name',)),
+    ('achievement', 'sports_base.Team', 'team', ('name',)),
+]
+
+
+def connect_search_signals():
+    for source in SOURCES:
+        uid = f'search:{source.kind}'
+        post_save.connect(_reindex_receiver(source.kind), sender=source.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(_remove_receiver(source.kind), sender=source.model, weak=False, dispatch_uid=uid)
+    for kind, label, lookup, fields in DEPENDENT_SOURCES:
+        post_save.connect(
+            _dependent_receiver(kind, lookup, fields),
+            sender=apps.get_model(label),
+            weak=False,
+            dispatch_uid=f'search:{kind}:{label}',
+        )
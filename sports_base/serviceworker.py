@@ -0,0 +1,138 @@
+"""
+Generated service worker.
+
+``/serviceworker.js`` is rendered from ``sports_base/serviceworker.js`` with
+a config built here. Each route gets its own caching strategy:
+
+* static files: on install, the files matching ``PRECACHE_PATTERNS`` (up to
+  ``PRECACHE_MAX_BYTES`` each) are precached, and the rest are cached as they
+  are fetched. With a manifest storage the URLs are hashed and served
+  cache-first. With plain ``StaticFilesStorage`` they are not, so they are
+  served stale-while-revalidate: a changed file shows up on the next load;
+* ``ROUTE_STRATEGIES``: pages by URL name, either ``stale-while-revalidate``
+  (shown from the cache at once, refreshed behind it) or ``network-first``
+  (the cached copy and then the offline page when the network fails or is
+  slower than ``NETWORK_TIMEOUT`` seconds);
+* ``CACHE_FIRST_MEDIA``: image derivatives, named by content, so a cached
+  copy never goes stale;
+* ``CDN_ORIGINS``: the versioned CSS/JS the templates load from CDNs.
+
+Cache names carry a version: the manifest hash, or without a manifest a hash
+of the static files' contents, combined with the config. A deploy that
+changes any static file changes the worker, and the new worker deletes the
+caches of the old one. Pages cached for a signed-in player are dropped on
+logout.
+"""
+import fnmatch
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+PRECACHE_PATTERNS = getattr(settings, 'SERVICE_WORKER_PRECACHE', ('images/my_app_icon_*', 'media/*'))
+PRECACHE_MAX_BYTES = 512 * 1024
+ROUTE_STRATEGIES = getattr(settings, 'SERVICE_WORKER_ROUTES', {
+    'static_pages:scoreboard': 'stale-while-revalidate',
+    'sports_base:events': 'stale-while-revalidate',
+    'sports_base:sports_schedules': 'stale-while-revalidate',
+    'Sports_Users:player_dashboard': 'network-first',
+})
+CLEAR_PAGES_ON = ('Sports_Users:player_logout',)
+CACHE_FIRST_MEDIA = ('derivatives/',)
+CDN_ORIGINS = getattr(settings, 'SERVICE_WORKER_CDN_ORIGINS', (
+    'https://cdn.jsdelivr.net',
+    'https://cdnjs.cloudflare.com',
+    'https://code.jquery.com',
+    'https://fonts.googleapis.com',
+    'https://fonts.gstatic.com',
+))
+NETWORK_TIMEOUT = 4
+MAX_ENTRIES = {'static': 200, 'pages': 50, 'media': 300, 'cdn': 60}
+
+
+def _precached(name, size):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in PRECACHE_PATTERNS) and size <= PRECACHE_MAX_BYTES
+
+
+def _manifest_assets(hashed_files, manifest_hash):
+    urls = []
+    for name, hashed_name in hashed_files.items():
+        try:
+            size = staticfiles_storage.size(hashed_name)
+        except OSError:
+            continue
+        if _precached(name, size):
+            urls.append(staticfiles_storage.url(name))
+    return sorted(urls), manifest_hash, 'cache-first'
+
+
+def _collected_assets():
+    """Without a manifest: the files collectstatic would copy, hashed by content."""
+    found = {}
+    for finder in finders.get_finders():
+        for name, storage in finder.list(['CVS', '.*', '*~']):
+            found.setdefault(name, storage)
+    digest = hashlib.md5()
+    urls = []
+    for name in sorted(found):
+        storage = found[name]
+        digest.update(name.encode('utf-8'))
+        with storage.open(name) as fh:
+            for chunk in iter(lambda: fh.read(64 * 1024), b''):
+                digest.update(chunk)
+        if _precached(name, storage.size(name)):
+            urls.append(staticfiles_storage.url(name))
+    return urls, digest.hexdigest(), 'stale-while-revalidate'
+
+
+def static_assets():
+    """``(precache URLs, version of the static files, strategy for /static/)``."""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    if hashed_files:
+        return _manifest_assets(hashed_files, staticfiles_storage.manifest_hash)
+    return _collected_assets()
+
+
+@lru_cache(maxsize=1)
+def worker_config():
+    """The worker's config; computed once per process, as static files only change on deploy."""
+    precache, static_version, static_strategy = static_assets()
+    config = {
+        'precache': precache,
+        'offline': reverse('offline'),
+        'staticUrl': settings.STATIC_URL,
+        'staticStrategy': static_strategy,
+        'routes': {reverse(name): strategy for name, strategy in ROUTE_STRATEGIES.items()},
+        'clearPagesOn': [reverse(name) for name in CLEAR_PAGES_ON],
+        'cacheFirst': [settings.MEDIA_URL + prefix for prefix in CACHE_FIRST_MEDIA],
+        'cdnOrigins': list(CDN_ORIGINS),
+        'networkTimeout': NETWORK_TIMEOUT,
+        'maxEntries': MAX_ENTRIES,
+    }
+    # Route changes evict old caches too
+    source = static_version + json.dumps(config, sort_keys=True)
+    config['version'] = hashlib.md5(source.encode('utf-8')).hexdigest()[:12]
+    return json.dumps(config, separators=(',', ':'))
+
+
+@require_safe
+def service_worker(request):
+    response = render(
+        request, 'sports_base/serviceworker.js', {'config': worker_config()}, content_type='application/javascript',
+    )
+    # Browsers check for a new worker on navigation; never let a cache answer for it
+    patch_cache_control(response, no_cache=True)
+    response['Service-Worker-Allowed'] = settings.PWA_APP_SCOPE
+    return response
+
+
+@require_safe
+def offline(request):
+    return render(request, 'static_pages/offline.html')
@@ -0,0 +1,110 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .images import RESPONSIVE_IMAGE_FIELDS, queue_derivatives
+from .inbox import notification_changed
+from .models import MatchResult, Notification, Team
+from .pagecache import invalidate_model
+from .search import connect_search_signals
+from .standings import MATCH_FIELDS, apply_match_change, match_values
+from .storage import connect_refcount_signals
+from .uploads import connect_upload_signals
+
+
+def _derivative_receiver(field_name):
+    def receiver(sender, instance, update_fields=None, **kwargs):
+        # e.g. last_login updates on CustomUser never touch the image
+        if update_fields is not None and field_name not in update_fields:
+            return
+        queue_derivatives(instance, field_name)
+    return receiver
+
+
+def connect_signals():
+    for label, field_name in RESPONSIVE_IMAGE_FIELDS:
+        post_save.connect(
+            _derivative_receiver(field_name),
+            sender=apps.get_model(label),
+            weak=False,
+            dispatch_uid=f'image_derivatives:{label}.{field_name}',
+        )
+    connect_search_signals()
+    connect_refcount_signals()
+    connect_upload_signals()
+
+
+@receiver(post_save, sender=Team)
+def refresh_team_match_names(sender, instance, created, **kwargs):
+    """Keep denormalized participant names in step with a renamed team."""
+    if created:
+        return
+    # Only rows whose name changes, so unrelated saves don't move the scoreboard's validators
+    now = timezone.now()
+    updated = MatchResult.objects.filter(team1=instance, team2__isnull=False).exclude(
+        participant1_name=instance.name
+    ).update(participant1_name=instance.name, updated_at=now)
+    updated += MatchResult.objects.filter(team2=instance, team1__isnull=False).exclude(
+        participant2_name=instance.name
+    ).update(participant2_name=instance.name, updated_at=now)
+    if updated:
+        invalidate_model(MatchResult)
+
+
+@receiver(m2m_changed, sender=Team.players.through)
+def touch_team_on_roster_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Roster edits count as a change to the team for HTTP validators."""
+    if not action.startswith('post_'):
+        return
+    # Forward changes come from a team; reverse ones from a player, with the team ids in pk_set
+    team_ids = pk_set if reverse else [instance.pk]
+    if team_ids:
+        Team.objects.filter(pk__in=team_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_player_match_names(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not {'first_name', 'last_name'} & set(update_fields)):
+        return
+    name = f"{instance.first_name} {instance.last_name}"
+    individual = Q(team1__isnull=True) | Q(team2__isnull=True)
+    now = timezone.now()
+    updated = MatchResult.objects.filter(individual, player1_id=instance.pk).exclude(
+        participant1_name=name
+    ).update(participant1_name=name, updated_at=now)
+    updated += MatchResult.objects.filter(individual, player2_id=instance.pk).exclude(
+        participant2_name=name
+    ).update(participant2_name=name, updated_at=now)
+    if updated:
+        invalidate_model(MatchResult)
+
+
+@receiver(pre_save, sender=MatchResult)
+def remember_previous_match(sender, instance, **kwargs):
+    instance._standings_previous = None
+    if not instance._state.adding and instance.pk:
+        instance._standings_previous = MatchResult.objects.filter(pk=instance.pk).values(*MATCH_FIELDS).first()
+
+
+@receiver(post_save, sender=MatchResult)
+def update_standings_on_save(sender, instance, **kwargs):
+    apply_match_change(getattr(instance, '_standings_previous', None), match_values(instance))
+
+
+@receiver(pre_delete, sender=MatchResult)
+def remember_deleted_match(sender, instance, **kwargs):
+    instance._standings_previous = match_values(instance)
+
+
+@receiver(post_delete, sender=MatchResult)
+def update_standings_on_delete(sender, instance, **kwargs):
+    apply_match_change(getattr(instance, '_standings_previous', None), None)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def refresh_unread_counts(sender, instance, **kwargs):
+    notification_changed(instance)
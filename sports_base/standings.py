@@ -0,0 +1,156 @@
+"""
+League tables.
+
+Standing rows are kept up to date incrementally: saving or deleting a
+MatchResult subtracts the old match's contribution and adds the new one with
+a couple of ``F()`` updates. ``rebuild_standings`` recomputes every table from
+scratch with grouped aggregates, for use after bulk edits that bypass save().
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractYear
+
+from .models import MatchResult, Standing
+from .pagecache import invalidate_model
+
+POINTS = getattr(settings, 'STANDINGS_POINTS', {'win': 3, 'draw': 1, 'loss': 0})
+
+STAT_FIELDS = ('played', 'won', 'drawn', 'lost', 'points_for', 'points_against', 'points')
+
+# Columns of MatchResult a match's contribution depends on.
+MATCH_FIELDS = ('sport_id', 'date', 'status', 'result', 'score1', 'score2', 'team1_id', 'team2_id', 'player1_id', 'player2_id')
+
+
+def _points(won, drawn, lost):
+    return won * POINTS['win'] + drawn * POINTS['draw'] + lost * POINTS['loss']
+
+
+def match_contributions(values):
+    """
+    Yield ``(row key, stats)`` pairs for a match given its MATCH_FIELDS values.
+
+    The row key is (sport_id, season, 'team' | 'player', participant id).
+    Matches that are not completed contribute nothing.
+    """
+    if not values or values['status'] != 'completed':
+        return
+    if values['team1_id'] and values['team2_id']:
+        kind, side1, side2 = 'team', values['team1_id'], values['team2_id']
+    elif values['player1_id'] and values['player2_id']:
+        kind, side1, side2 = 'player', values['player1_id'], values['player2_id']
+    else:
+        return
+    season = values['date'].year
+    draw = values['result'] == 'draw'
+    won1 = values['result'] in ('team1_win', 'player1_win')
+    won2 = values['result'] in ('team2_win', 'player2_win')
+    for pid, won, lost, scored, conceded in (
+        (side1, won1, won2, values['score1'], values['score2']),
+        (side2, won2, won1, values['score2'], values['score1']),
+    ):
+        stats = {
+            'played': 1,
+            'won': int(won),
+            'drawn': int(draw),
+            'lost': int(lost),
+            'points_for': scored,
+            'points_against': conceded,
+            'points': _points(int(won), int(draw), int(lost)),
+        }
+        yield (values['sport_id'], season, kind, pid), stats
+
+
+def match_values(match):
+    return {field: getattr(match, field) for field in MATCH_FIELDS}
+
+
+def _apply_delta(key, delta):
+    sport_id, season, kind, pid = key
+    lookup = {'sport_id': sport_id, 'season': season, f'{kind}_id': pid}
+    updates = {field: F(field) + value for field, value in delta.items()}
+    if Standing.objects.filter(**lookup).update(**updates):
+        if delta.get('played', 0) < 0:
+            Standing.objects.filter(**lookup, played__lte=0).delete()
+        return
+    # A missing row can only be created by a match being added; when only
+    # removing a match the row is already gone (e.g. a cascading delete).
+    if delta.get('played', 0) <= 0:
+        return
+    try:
+        with transaction.atomic():
+            Standing.objects.create(**lookup, **delta)
+    except IntegrityError:
+        # Another worker created the row first
+        Standing.objects.filter(**lookup).update(**updates)
+
+
+def apply_match_change(old_values, new_values):
+    """Move the standings from ``old_values`` to ``new_values`` (either may be None)."""
+    deltas = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    for key, stats in match_contributions(old_values):
+        for field, value in stats.items():
+            deltas[key][field] -= value
+    for key, stats in match_contributions(new_values):
+        for field, value in stats.items():
+            deltas[key][field] += value
+
+    changed = False
+    with transaction.atomic():
+        for key, delta in deltas.items():
+            delta = {field: value for field, value in delta.items() if value}
+            if delta:
+                _apply_delta(key, delta)
+                changed = True
+    if changed:
+        # Rows change through update(), which sends no signals
+        transaction.on_commit(partial(invalidate_model, Standing))
+
+
+def _side_aggregate(kind, side, other):
+    """Aggregate one side (1 or 2) of every completed team or individual match."""
+    own, opp = f'{kind}{side}_id', f'{kind}{other}_id'
+    win = Q(result=f'{kind}{side}_win')
+    loss = Q(result=f'{kind}{other}_win')
+    matches = MatchResult.objects.filter(status='completed', **{f'{own}__isnull': False, f'{opp}__isnull': False})
+    if kind == 'player':
+        matches = matches.filter(Q(team1__isnull=True) | Q(team2__isnull=True))
+    return matches.annotate(season=ExtractYear('date')).values('sport_id', 'season', own).annotate(
+        played=Count('id'),
+        won=Count('id', filter=win),
+        drawn=Count('id', filter=Q(result='draw')),
+        lost=Count('id', filter=loss),
+        points_for=Sum(f'score{side}'),
+        points_against=Sum(f'score{other}'),
+    ).order_by()
+
+
+def rebuild_standings():
+    """Recompute every Standing row from MatchResult. Returns the number of rows written."""
+    totals = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    for kind in ('team', 'player'):
+        for side, other in ((1, 2), (2, 1)):
+            for row in _side_aggregate(kind, side, other):
+                key = (row['sport_id'], row['season'], kind, row[f'{kind}{side}_id'])
+                for field in STAT_FIELDS[:-1]:
+                    totals[key][field] += row[field]
+
+    rows = []
+    for (sport_id, season, kind, pid), stats in totals.items():
+        stats['points'] = _points(stats['won'], stats['drawn'], stats['lost'])
+        rows.append(Standing(sport_id=sport_id, season=season, **{f'{kind}_id': pid}, **stats))
+
+    with transaction.atomic():
+        Standing.objects.all().delete()
+        Standing.objects.bulk_create(rows, batch_size=500)
+    invalidate_model(Standing)
+    return len(rows)
+
+
+def league_table(sport_id, season):
+    return Standing.objects.filter(sport_id=sport_id, season=season).select_related(
+        'team', 'player__user'
+    ).order_by('-points', (F('points_against') - F('points_for')).asc(), '-points_for', 'id')
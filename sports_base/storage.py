@@ -0,0 +1,302 @@
+"""
+Content-addressed media storage.
+
+``HashedMediaStorage`` names every upload after the SHA-256 of its bytes:
+``blobs/<2 hex>/<sha256><ext>``. An identical upload, in any field, reuses
+the stored file instead of writing a ``name_abc123.png`` copy. A name
+therefore never changes meaning, so its responses can be cached forever.
+Files under a ``PROTECTED_MEDIA_PREFIXES`` entry stay under that prefix
+(``certificates/blobs/...``), and ``sports_base.media`` keeps refusing them
+from ``MEDIA_URL``. Names under ``UNTRACKED_PREFIXES`` are stored as given;
+image derivatives are already named by content and referenced from
+``ImageVariantSet`` rather than file fields.
+
+Each blob has a ``MediaBlob`` row. Its ``refcount`` is kept up to date by
+``connect_refcount_signals`` as model file fields change. A blob may be
+shared, so ``delete()`` leaves it on disk. ``manage.py gc_media`` recounts
+the references and removes blobs that nothing has named for a grace period.
+``manage.py rehash_media`` moves files saved before this storage onto blob
+names.
+"""
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'blobs'
+UNTRACKED_PREFIXES = tuple(getattr(settings, 'MEDIA_UNTRACKED_PREFIXES', ('derivatives/',)))
+GC_GRACE = timedelta(hours=24)
+BLOB_RE = re.compile(rf'(?:^|/){BLOB_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(?:\.\w+)?$')
+
+
+def _blob_model():
+    return apps.get_model('sports_base', 'MediaBlob')
+
+
+def is_blob(name):
+    return bool(name) and BLOB_RE.search(name) is not None
+
+
+def is_tracked(name):
+    return not name.startswith(UNTRACKED_PREFIXES)
+
+
+def blob_name_for(name, digest):
+    """Blob name for content ``digest`` uploaded as ``name``: namespace + hash + extension."""
+    namespace = next((prefix for prefix in settings.PROTECTED_MEDIA_PREFIXES if name.startswith(prefix)), '')
+    extension = os.path.splitext(name)[1].lower()
+    return f"{namespace}{BLOB_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+def content_digest(content):
+    """SHA-256 hex digest and size of a Django ``File``, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct content once, under its SHA-256."""
+
+    def _save(self, name, content):
+        if not is_tracked(name):
+            return super()._save(name, content)
+        digest, size = content_digest(content)
+        blob_name = blob_name_for(name, digest)
+        # The row is touched before the file is looked for. A re-upload restarts the
+        # garbage collection grace period, and a blob collected meanwhile is written again.
+        now = timezone.now()
+        _blob_model().objects.update_or_create(
+            name=blob_name,
+            defaults={'stored_at': now},
+            create_defaults={'sha256': digest, 'size': size, 'stored_at': now},
+        )
+        if not self.exists(blob_name):
+            saved = super()._save(blob_name, content)
+            if saved != blob_name:
+                # A concurrent upload of the same content got there first
+                super().delete(saved)
+        return blob_name
+
+    def delete(self, name):
+        """Other rows may share a blob, so blobs are left for ``gc_media``."""
+        if is_blob(name):
+            return
+        super().delete(name)
+
+    def delete_blob(self, name):
+        super().delete(name)
+
+
+# ---------------------- Reference counts ----------------------
+
+def file_fields():
+    """``(model, field)`` for every file field of every installed model."""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField)
+    ]
+
+
+def _stored_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def adjust_refcounts(added=(), removed=()):
+    """Count references gained and lost by a save or delete; names that aren't blobs are ignored."""
+    blobs = _blob_model().objects
+    for name, count in Counter(name for name in added if is_blob(name)).items():
+        blobs.filter(name=name).update(refcount=F('refcount') + count)
+    for name, count in Counter(name for name in removed if is_blob(name)).items():
+        blobs.filter(name=name, refcount__gte=count).update(refcount=F('refcount') - count)
+
+
+def _remember_names(attnames):
+    def receiver(sender, instance, **kwargs):
+        # Deferred fields are absent from __dict__ and stay unknown
+        instance._media_names = {
+            attname: _stored_name(instance.__dict__[attname]) for attname in attnames if attname in instance.__dict__
+        }
+    return receiver
+
+
+def _count_saved(fields):
+    def receiver(sender, instance, created=False, update_fields=None, **kwargs):
+        before = {} if created else getattr(instance, '_media_names', {})
+        after = {}
+        added, removed = [], []
+        for name, attname in fields:
+            if update_fields is not None and name not in update_fields:
+                continue
+            if attname not in instance.__dict__ or not (created or attname in before):
+                continue
+            after[attname] = _stored_name(instance.__dict__[attname])
+            if after[attname] != before.get(attname, ''):
+                added.append(after[attname])
+                removed.append(before.get(attname, ''))
+        if added or removed:
+            adjust_refcounts(added, removed)
+        instance._media_names = {**before, **after}
+    return receiver
+
+
+def _count_deleted(attnames):
+    def receiver(sender, instance, **kwargs):
+        adjust_refcounts(removed=[
+            _stored_name(instance.__dict__[attname]) for attname in attnames if attname in instance.__dict__
+        ])
+    return receiver
+
+
+def connect_refcount_signals():
+    by_model = {}
+    for model, field in file_fields():
+        by_model.setdefault(model, []).append((field.name, field.attname))
+    for model, fields in by_model.items():
+        attnames = [attname for _, attname in fields]
+        uid = f'media_refcount:{model._meta.label}'
+        post_init.connect(_remember_names(attnames), sender=model, weak=False, dispatch_uid=uid)
+        post_save.connect(_count_saved(fields), sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(_count_deleted(attnames), sender=model, weak=False, dispatch_uid=uid)
+
+
+def reference_counts():
+    """How many file field values name each stored file, counted from the database."""
+    counts = Counter()
+    for model, field in file_fields():
+        names = model._default_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(**{field.attname: ''})
+        counts.update(names.values_list(field.attname, flat=True).iterator())
+    return counts
+
+
+def recount_references():
+    """Set every ``MediaBlob.refcount`` from the database; return how many changed."""
+    counts = reference_counts()
+    changed = []
+    for blob in _blob_model().objects.only('pk', 'name', 'refcount').iterator():
+        if blob.refcount != counts[blob.name]:
+            blob.refcount = counts[blob.name]
+            changed.append(blob)
+    _blob_model().objects.bulk_update(changed, ['refcount'], batch_size=500)
+    return len(changed)
+
+
+# ---------------------- Maintenance ----------------------
+
+def _blob_files(storage):
+    """Names of blob files on disk, under every blob directory."""
+    for namespace in ['', *settings.PROTECTED_MEDIA_PREFIXES]:
+        root = f"{namespace}{BLOB_DIR}"
+        if not storage.exists(root):
+            continue
+        for shard in storage.listdir(root)[0]:
+            for filename in storage.listdir(f"{root}/{shard}")[1]:
+                name = f"{root}/{shard}/{filename}"
+                if is_blob(name):
+                    yield name
+
+
+def _remove_orphan(storage, name, cutoff, has_row):
+    """
+    Delete blob ``name`` if it is still unreferenced, re-checked in the same
+    transaction. Its row goes first: an upload that touches the row meanwhile
+    either keeps it from matching or writes the file again.
+    """
+    blobs = _blob_model().objects
+    with transaction.atomic():
+        if has_row:
+            deleted, _ = blobs.filter(name=name, refcount=0, stored_at__lt=cutoff).delete()
+            if not deleted:
+                return False
+        elif blobs.filter(name=name).exists():
+            return False
+        storage.delete_blob(name)
+    return True
+
+
+def collect_garbage(grace=GC_GRACE, dry_run=False, storage=None):
+    """
+    Remove blobs nothing refers to, after recounting references. Blobs stored
+    within ``grace`` are kept: their upload may not have been saved to its row yet.
+    Return ``(files removed, bytes freed)``.
+    """
+    storage = storage or default_storage
+    recount_references()
+    cutoff = timezone.now() - grace
+    blobs = _blob_model().objects
+    candidates = [(name, size, True) for name, size in blobs.filter(refcount=0, stored_at__lt=cutoff).values_list(
+        'name', 'size',
+    )]
+    known = set(blobs.values_list('name', flat=True))
+    referenced = reference_counts()
+    # Blob files without a row, e.g. left by an interrupted upload
+    for name in _blob_files(storage):
+        if name not in known and not referenced[name] and storage.get_modified_time(name) < cutoff:
+            candidates.append((name, storage.size(name), False))
+    if not dry_run:
+        candidates = [
+            (name, size, has_row) for name, size, has_row in candidates
+            if _remove_orphan(storage, name, cutoff, has_row)
+        ]
+    return len(candidates), sum(size for _, size, _ in candidates)
+
+
+def rehash_existing(dry_run=False, keep_originals=False, storage=None):
+    """
+    Move files saved under their upload names onto blob names, point every
+    row at the blob and carry image derivatives over. Returns
+    ``(rows updated, distinct blobs, originals removed, missing files)``.
+    """
+    storage = storage or default_storage
+    ImageVariantSet = apps.get_model('sports_base', 'ImageVariantSet')
+    renamed = {}
+    missing = set()
+    rows = 0
+    for model, field in file_fields():
+        names = model._default_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(**{field.attname: ''})
+        for pk, name in names.values_list('pk', field.attname).iterator():
+            if is_blob(name) or not is_tracked(name) or name in missing:
+                continue
+            if name not in renamed:
+                if not storage.exists(name):
+                    logger.warning("rehash_media: %s is missing", name)
+                    missing.add(name)
+                    continue
+                with storage.open(name, 'rb') as fh:
+                    if dry_run:
+                        renamed[name] = blob_name_for(name, content_digest(File(fh))[0])
+                    else:
+                        renamed[name] = storage.save(name, File(fh))
+            if not dry_run:
+                model._default_manager.filter(pk=pk).update(**{field.attname: renamed[name]})
+            rows += 1
+    removed = 0
+    if not dry_run:
+        for old, new in renamed.items():
+            if ImageVariantSet.objects.filter(source=new).exists():
+                ImageVariantSet.objects.filter(source=old).delete()
+            else:
+                ImageVariantSet.objects.filter(source=old).update(source=new)
+            if not keep_originals:
+                storage.delete(old)
+                removed += 1
+        recount_references()
+    return rows, len(set(renamed.values())), removed, len(missing)
@@ -0,0 +1,15 @@
+from .images import build_derivatives
+from .jobs import get_job_object, job_handler
+
+
+@job_handler('image_derivatives')
+def build_image_derivatives_job(job):
+    field_name, source = job.version.split(':', 1)
+    instance = get_job_object(job)
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    # The file was replaced after this job was queued; a newer job covers it
+    if not field_file or field_file.name != source:
+        return
+    build_derivatives(field_file)
@@ -0,0 +1,144 @@
+// Generated by sports_base.serviceworker; see that module for the strategies.
+const CONFIG = {{ config|safe }};
+const PREFIX = 'gigccl-';
+const CACHE = {
+  precache: `${PREFIX}precache-${CONFIG.version}`,
+  static: `${PREFIX}static-${CONFIG.version}`,
+  pages: `${PREFIX}pages-${CONFIG.version}`,
+  media: `${PREFIX}media-${CONFIG.version}`,
+  cdn: `${PREFIX}cdn-${CONFIG.version}`,
+};
+const CURRENT = new Set(Object.values(CACHE));
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE.precache);
+    // Anonymous, so the cached offline page never carries a player's navbar
+    await cache.add(new Request(CONFIG.offline, {credentials: 'omit'}));
+    // One missing file must not keep the worker from installing
+    await Promise.all(CONFIG.precache.map(url => cache.add(url).catch(() => null)));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    // Caches of earlier versions, and of the stock django-pwa worker
+    const names = await caches.keys();
+    await Promise.all(names
+      .filter(name => (name.startsWith(PREFIX) || name.startsWith('django-pwa-')) && !CURRENT.has(name))
+      .map(name => caches.delete(name)));
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    if (request.method === 'GET' && CONFIG.cdnOrigins.includes(url.origin)) {
+      event.respondWith(staleWhileRevalidate(event, CACHE.cdn, CONFIG.maxEntries.cdn));
+    }
+    return;
+  }
+  if (CONFIG.clearPagesOn.includes(url.pathname)) {
+    event.waitUntil(caches.delete(CACHE.pages));
+    return;
+  }
+  if (request.method !== 'GET') {
+    return;
+  }
+  if (url.pathname.startsWith(CONFIG.staticUrl)) {
+    event.respondWith(staticFile(event));
+  } else if (CONFIG.cacheFirst.some(prefix => url.pathname.startsWith(prefix))) {
+    event.respondWith(cacheFirst(request, CACHE.media, CONFIG.maxEntries.media));
+  } else if (CONFIG.routes[url.pathname] === 'stale-while-revalidate') {
+    event.respondWith(staleWhileRevalidate(event, CACHE.pages, CONFIG.maxEntries.pages));
+  } else if (CONFIG.routes[url.pathname] === 'network-first') {
+    event.respondWith(networkFirst(event, CACHE.pages, CONFIG.maxEntries.pages));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(fetch(request).catch(offline));
+  }
+});
+
+function offline() {
+  return caches.match(CONFIG.offline, {cacheName: CACHE.precache}).then(response => response || Response.error());
+}
+
+async function staticFile(event) {
+  const precached = await caches.match(event.request, {cacheName: CACHE.precache});
+  if (precached) {
+    return precached;
+  }
+  // Unhashed URLs (no manifest) can change content under the same name
+  if (CONFIG.staticStrategy === 'cache-first') {
+    return cacheFirst(event.request, CACHE.static, CONFIG.maxEntries.static);
+  }
+  return staleWhileRevalidate(event, CACHE.static, CONFIG.maxEntries.static);
+}
+
+function cacheable(response) {
+  // Opaque: cross-origin CDN files; redirects (e.g. to the login page) are never stored
+  return response.type === 'opaque' || (response.ok && !response.redirected);
+}
+
+async function trim(cacheName, maxEntries) {
+  const cache = await caches.open(cacheName);
+  const keys = await cache.keys();
+  // Keys come back in insertion order, so the oldest go first
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map(key => cache.delete(key)));
+}
+
+async function store(request, response, cacheName, maxEntries) {
+  if (!cacheable(response)) {
+    return;
+  }
+  const cache = await caches.open(cacheName);
+  await cache.put(request, response);
+  if (maxEntries) {
+    await trim(cacheName, maxEntries);
+  }
+}
+
+async function cacheFirst(request, cacheName, maxEntries) {
+  const cached = await caches.match(request, {cacheName});
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(request);
+  await store(request, response.clone(), cacheName, maxEntries);
+  return response;
+}
+
+function staleWhileRevalidate(event, cacheName, maxEntries) {
+  const request = event.request;
+  const network = fetch(request).then(async response => {
+    await store(request, response.clone(), cacheName, maxEntries);
+    return response;
+  });
+  event.waitUntil(network.catch(() => null));
+  return caches.match(request, {cacheName, ignoreVary: true}).then(cached => cached || network.catch(() => {
+    return request.mode === 'navigate' ? offline() : Response.error();
+  }));
+}
+
+function networkFirst(event, cacheName, maxEntries) {
+  const request = event.request;
+  const network = fetch(request).then(async response => {
+    if (response.type === 'opaqueredirect') {
+      // Signed out elsewhere: the cached page belongs to the previous session
+      const cache = await caches.open(cacheName);
+      await cache.delete(request, {ignoreVary: true});
+    } else {
+      await store(request, response.clone(), cacheName, maxEntries);
+    }
+    return response;
+  });
+  event.waitUntil(network.catch(() => null));
+  const cached = () => caches.match(request, {cacheName, ignoreVary: true});
+  // On a slow network show the cached copy; the fetch still refreshes the cache
+  const timeout = new Promise(resolve => setTimeout(resolve, CONFIG.networkTimeout * 1000))
+    .then(cached)
+    .then(response => response || network);
+  return Promise.race([network, timeout]).catch(async () => (await cached()) || offline());
+}
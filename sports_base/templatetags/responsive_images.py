@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html
+
+from sports_base.images import get_variants, request_derivatives, srcset_for
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_img(image, sizes='100vw', alt='', css_class='', loading='lazy'):
+    """
+    Render ``<picture>`` markup with WebP and JPEG ``srcset``s for an ImageField.
+
+    Falls back to the original file (and queues a derivative build) when the
+    derivatives have not been generated yet.
+    """
+    if not image:
+        return ''
+    data = get_variants(image.name)
+    if data is None:
+        request_derivatives(image)
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">',
+            image.url, alt, css_class, loading,
+        )
+    fallback = max((v for v in data['variants'] if v['fmt'] == 'jpg'), key=lambda v: v['w'])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="{}">'
+        '</picture>',
+        srcset_for(data, 'webp'), sizes,
+        image.storage.url(fallback['name']), srcset_for(data, 'jpg'), sizes,
+        data['width'], data['height'], alt, css_class, loading,
+    )
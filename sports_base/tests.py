@@ -1,3 +1,81 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from Sports_Users.models import Certificate
+from static_pages.tests import FAST_HASHERS, TEST_STORAGES, make_player
+from .models import MediaBlob, Sport
+
+HASHED_STORAGES = {
+    **TEST_STORAGES,
+    'default': {'BACKEND': 'sports_base.storage.HashedMediaStorage'},
+}
+
+
+@override_settings(STORAGES=HASHED_STORAGES, PASSWORD_HASHERS=FAST_HASHERS)
+class HashedMediaStorageTests(TestCase):
+    """Identical uploads share one blob, which outlives its rows until gc_media collects it."""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.player = make_player('me@example.com', Sport.objects.create(name='Cricket'))
+
+    def certificate(self, filename, content=b'%PDF-1.4 certificate'):
+        cert = Certificate(player=self.player, title=filename)
+        cert.certificate_file.save(filename, ContentFile(content))
+        return cert
+
+    def test_identical_uploads_share_a_blob(self):
+        first = self.certificate('first.pdf')
+        second = self.certificate('second.pdf')
+        self.assertEqual(first.certificate_file.name, second.certificate_file.name)
+        self.assertEqual(MediaBlob.objects.get().refcount, 2)
+
+    def test_deleting_one_row_keeps_the_blob(self):
+        first = self.certificate('first.pdf')
+        second = self.certificate('second.pdf')
+        first.delete()
+        self.assertTrue(default_storage.exists(second.certificate_file.name))
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
+
+    def test_gc_media_removes_the_last_reference_after_the_grace_period(self):
+        cert = self.certificate('only.pdf')
+        name = cert.certificate_file.name
+        cert.delete()
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(name))
+
+        MediaBlob.objects.update(stored_at=timezone.now() - timedelta(days=2))
+        call_command('gc_media', stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_rehash_media_moves_files_onto_blob_names(self):
+        # Saved before HashedMediaStorage: plain upload names, one file per row
+        plain = FileSystemStorage()
+        names = [plain.save('certificates/old.pdf', ContentFile(b'%PDF-1.4 old')) for _ in range(2)]
+        certs = [Certificate.objects.create(player=self.player, title='Old', certificate_file=name) for name in names]
+
+        call_command('rehash_media', stdout=StringIO())
+
+        blob_names = {cert.certificate_file.name for cert in Certificate.objects.filter(pk__in=[c.pk for c in certs])}
+        self.assertEqual(len(blob_names), 1)
+        blob_name = blob_names.pop()
+        self.assertTrue(blob_name.startswith('certificates/blobs/'))
+        with default_storage.open(blob_name) as fh:
+            self.assertEqual(fh.read(), b'%PDF-1.4 old')
+        self.assertFalse(any(plain.exists(name) for name in names))
+        self.assertEqual(MediaBlob.objects.get(name=blob_name).refcount, 2)
@@ -0,0 +1,169 @@
+"""
+Upload-time image normalization.
+
+Every image field listed in ``IMAGE_UPLOAD_POLICIES`` has one policy: the
+longest edge to keep, the JPEG quality and the largest pixel count accepted.
+``validate_image_upload``, a validator on those model fields, reads only
+the image header. Forms and the admin therefore turn away decompression
+bombs before any pixel is decoded. ``normalize_image`` runs on
+``pre_save`` for new uploads. It:
+
+* decodes JPEGs at reduced scale where possible (``Image.draft``);
+* applies the EXIF orientation;
+* downscales to the policy's edge;
+* re-encodes without EXIF/XMP metadata. An RGB ICC profile is kept;
+  CMYK images are converted to sRGB through theirs.
+
+Opaque images are stored as JPEG and images with transparency as PNG.
+Animated images are stored as uploaded.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db.models.signals import pre_save
+from PIL import Image, ImageCms, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {
+    'max_edge': 2048,
+    'quality': 82,
+    # Header dimensions above this are refused before decoding; 64 MP covers camera sensors
+    'max_pixels': 64_000_000,
+}
+
+# Modes whose pixels are RGB, so an embedded profile still describes them after saving
+RGB_MODES = ('RGB', 'RGBA', 'RGBX', 'P', 'PA')
+SRGB_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB'))
+
+# 'app_label.Model.field' -> overrides of DEFAULT_POLICY
+IMAGE_UPLOAD_POLICIES = getattr(settings, 'IMAGE_UPLOAD_POLICIES', {
+    'Sports_Users.CustomUser.profile_picture': {'max_edge': 800},
+    'sports_base.Coach.photo': {'max_edge': 1200},
+    'sports_base.Team.logo': {'max_edge': 512},
+    'sports_base.Sport.image': {'max_edge': 1600},
+    'sports_base.SportGallery.image': {'max_edge': 2048},
+    # Schedules are photographed or scanned text; keep them legible
+    'sports_base.SportSchedule.image': {'max_edge': 2400, 'quality': 88},
+    'static_pages.HomePic.image': {'max_edge': 2048},
+    'static_pages.HODMessage.image': {'max_edge': 800},
+})
+
+
+def policy_for(model, field_name):
+    """The policy for ``model.field_name``, or None when its uploads are stored as they are."""
+    overrides = IMAGE_UPLOAD_POLICIES.get(f'{model._meta.label}.{field_name}')
+    if overrides is None:
+        return None
+    return {**DEFAULT_POLICY, **overrides}
+
+
+def _open(file, policy):
+    """Open the image header and refuse oversized dimensions before anything is decoded."""
+    file.seek(0)
+    try:
+        image = Image.open(file)
+    except (Image.DecompressionBombError, UnidentifiedImageError, OSError):
+        raise ValidationError("Upload a valid image that is not unreasonably large.", code='invalid_image')
+    width, height = image.size
+    if width * height > policy['max_pixels']:
+        raise ValidationError(
+            "The image is %(width)s x %(height)s pixels; images may have at most %(limit)s megapixels.",
+            code='image_too_large',
+            params={'width': width, 'height': height, 'limit': policy['max_pixels'] // 1_000_000},
+        )
+    return image
+
+
+def validate_image_upload(value):
+    """Field validator: check new uploads against the field's policy using only the header."""
+    if getattr(value, '_committed', True):
+        return
+    policy = policy_for(value.instance.__class__, value.field.name)
+    if policy is not None:
+        _open(value.file, policy)
+
+
+def _to_rgb_colour_space(image, icc_profile):
+    """
+    The output is RGB, so only an RGB profile can travel with it. CMYK images
+    are converted to sRGB through their profile; any other profile is dropped.
+    """
+    if not icc_profile or image.mode in RGB_MODES:
+        return image, icc_profile
+    if image.mode != 'CMYK':
+        return image, None
+    try:
+        source = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
+        converted = ImageCms.profileToProfile(image, source, SRGB_PROFILE, outputMode='RGB')
+    except (ImageCms.PyCMSError, OSError, ValueError) as e:
+        logger.warning(f"Could not apply the embedded CMYK colour profile: {e}")
+        return image, None
+    return converted, SRGB_PROFILE.tobytes()
+
+
+def normalize_image(file, policy):
+    """
+    Return ``file`` oriented, downscaled to ``policy['max_edge']`` and
+    re-encoded without metadata, as a ``ContentFile``; None for animations.
+    """
+    image = _open(file, policy)
+    if getattr(image, 'is_animated', False):
+        return None
+    edge = policy['max_edge']
+    # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale straight from the DCT data
+    image.draft('RGB', (edge, edge))
+    icc_profile = image.info.get('icc_profile')
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((edge, edge), Image.LANCZOS)
+    image, icc_profile = _to_rgb_colour_space(image, icc_profile)
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    buf = BytesIO()
+    if has_alpha:
+        image = image.convert('RGBA')
+        image.save(buf, format='PNG', optimize=True, icc_profile=icc_profile)
+        extension = '.png'
+    else:
+        image = image.convert('RGB')
+        image.save(
+            buf, format='JPEG', quality=policy['quality'], optimize=True, progressive=True, icc_profile=icc_profile,
+        )
+        extension = '.jpg'
+    stem = os.path.splitext(os.path.basename(file.name or 'image'))[0]
+    return ContentFile(buf.getvalue(), name=stem + extension)
+
+
+def _normalize_receiver(field_name, policy):
+    def receiver(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name)
+        if not field_file or field_file._committed:
+            return
+        try:
+            normalized = normalize_image(field_file.file, policy)
+        except ValidationError:
+            # Only uploads that skipped form validation get here; refuse to store them
+            raise
+        except Exception as e:
+            logger.error(f"Image normalization failed for {sender._meta.label}.{field_name}: {e}")
+            return
+        if normalized is not None:
+            setattr(instance, field_name, normalized)
+    return receiver
+
+
+def connect_upload_signals():
+    for key, overrides in IMAGE_UPLOAD_POLICIES.items():
+        app_label, model_name, field_name = key.split('.')
+        model = apps.get_model(app_label, model_name)
+        pre_save.connect(
+            _normalize_receiver(field_name, {**DEFAULT_POLICY, **overrides}),
+            sender=model,
+            weak=False,
+            dispatch_uid=f'upload_policy:{key}',
+        )
@@ -8,8 +8,11 @@ urlpatterns = [
     path("sports/", baseviews.sports, name="sports"),
     path("events/", baseviews.events, name="events"),
     path('notifications/', baseviews.notification_list, name='notification_list'),
+    path('notifications/<int:notification_id>/read/', baseviews.notification_read, name='notification_read'),
+    path('notifications/read-all/', baseviews.notification_read_all, name='notification_read_all'),
     path('feedback/', baseviews.feedback, name='feedback'),
     path('schedules/', baseviews.sports_schedules, name='sports_schedules'),
     path('gallery/', baseviews.sports_gallery, name='sports_gallery'),
     path('coaches/', baseviews.coach_profile, name='coach_profile'),
+    path('search/', baseviews.search, name='search'),
 ]
\ No newline at end of file
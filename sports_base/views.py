@@ -1,23 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import Sport, Event, Notification, SportSchedule, SportGallery, Team, Coach, MatchResult, Feedback
 from Sports_Users.models import Player
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
 from .forms import FeedbackForm
+from .conditional import conditional_page
+from .inbox import inbox_page, inbox_queryset, mark_all_read, mark_read
+from .pagecache import cache_public_page
+from .pagination import KeysetPaginator
+from .search import RESULTS_LIMIT, search_documents
 
+@conditional_page((SportGallery, 'updated_at'))
+@cache_public_page(SportGallery)
 def sports_gallery(request):
-    sports_list = SportGallery.objects.all().order_by('-id')
-    paginator = Paginator(sports_list, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(SportGallery.objects.all(), 12, ordering=('-id',), estimate_count=True)
+    page_obj = paginator.get_page(request.GET.get('page'))
     return render(request, 'sports_base/sports_gallery.html', {'page_obj': page_obj})
 
+@conditional_page((SportSchedule, 'updated_at'))
+@cache_public_page(SportSchedule)
 def sports_schedules(request):
-    schedules_list = SportSchedule.objects.all().order_by('-uploaded_at')
-    paginator = Paginator(schedules_list, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(SportSchedule.objects.all(), 12, ordering=('-uploaded_at',), estimate_count=True)
+    page_obj = paginator.get_page(request.GET.get('page'))
     return render(request, 'sports_base/sports_schedules.html', {'page_obj': page_obj})
 
 def feedback(request):
@@ -36,32 +43,60 @@ def feedback(request):
         form = FeedbackForm()
     return render(request, 'sports_base/feedback.html', {'form': form})
 
+@conditional_page((Notification, 'updated_at'))
 def notification_list(request):
+    """General and personal notifications, newest first, with read markers."""
     if request.user.is_authenticated:
-        notifications = Notification.objects.filter(is_general=True).order_by('-created_at')
-        paginator = Paginator(notifications, 10)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        page_obj = inbox_page(request.user, request.GET.get('page'))
         return render(request, 'sports_base/notification_list.html', {'page_obj': page_obj})
     return redirect('Sports_Users:player_login')
 
+def _back_to_inbox(request):
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('sports_base:notification_list')
+
+@login_required
+@require_POST
+def notification_read(request, notification_id):
+    notification = get_object_or_404(inbox_queryset(request.user), pk=notification_id)
+    mark_read(request.user, notification)
+    return _back_to_inbox(request)
+
+@login_required
+@require_POST
+def notification_read_all(request):
+    mark_all_read(request.user)
+    messages.success(request, 'All notifications marked as read.')
+    return _back_to_inbox(request)
+
+@conditional_page((Sport, 'updated_at'))
+@cache_public_page(Sport)
 def sports(request):
-    sport_list = Sport.objects.all().order_by('name')
-    paginator = Paginator(sport_list, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(Sport.objects.all(), 9, ordering=('name',), estimate_count=True)
+    page_obj = paginator.get_page(request.GET.get('page'))
     return render(request, 'sports_base/sports.html', {'page_obj': page_obj})
 
+@conditional_page((Event, 'updated_at'))
+@cache_public_page(Event)
 def events(request):
-    event_list = Event.objects.all().order_by('-date')
-    paginator = Paginator(event_list, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(Event.objects.all(), 12, ordering=('-date',), estimate_count=True)
+    page_obj = paginator.get_page(request.GET.get('page'))
     return render(request, 'sports_base/events.html', {'page_obj': page_obj})
 
+@cache_public_page(Coach, Sport)
 def coach_profile(request):
-    coaches = Coach.objects.all().order_by('name')
-    paginator = Paginator(coaches, 9)  # Display 9 coaches per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return render(request, 'sports_base/coach_profile.html', {'page_obj': page_obj})
\ No newline at end of file
+    paginator = KeysetPaginator(Coach.objects.all(), 9, ordering=('name',), estimate_count=True)  # Display 9 coaches per page
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'sports_base/coach_profile.html', {'page_obj': page_obj})
+
+def search(request):
+    """Site search over events, gallery, coaches, teams, achievements and notifications."""
+    query = request.GET.get('q', '').strip()[:200]
+    results = search_documents(query, request.user) if query else []
+    return render(request, 'sports_base/search.html', {
+        'query': query,
+        'results': results,
+        'limit_reached': len(results) >= RESULTS_LIMIT,
+    })
@@ -1,9 +1,11 @@
 from django.contrib import admin
 from .models import Achievements, HomePic, HODMessage
+from sports_base.search import IndexedSearchMixin
 
 
 @admin.register(Achievements)
-class AchievementsAdmin(admin.ModelAdmin):
+class AchievementsAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = 'achievement'
     list_display = ('description', 'team')
     list_filter = ('team',)
     search_fields = ('description', 'team__name')
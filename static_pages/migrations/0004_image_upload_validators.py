@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 16:27
+
+import sports_base.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('static_pages', '0003_delete_news'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hodmessage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='hod_photos/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+        migrations.AlterField(
+            model_name='homepic',
+            name='image',
+            field=models.ImageField(upload_to='carousel/', validators=[sports_base.uploads.validate_image_upload]),
+        ),
+    ]
@@ -1,3 +1,71 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Sports_Users.models import CustomUser, Player
+from sports_base.models import Coach, Sport, Team
+from .models import Achievements
+
+# The manifest storage needs collectstatic; plain storage is enough to render templates
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def make_player(email, sport, **extra_fields):
+    user = CustomUser.objects.create_user(
+        email, 'pass12345', first_name='Test', last_name=email.split('@')[0],
+        is_player=True, status='approved', **extra_fields
+    )
+    return Player.objects.create(
+        user=user, father_name='Father', father_cnic='12345-1234567-1', dob=datetime.date(2005, 1, 1),
+        province='Punjab', city='Lahore', address='Address', sport=sport, height=5.5, weight=60,
+        college_roll_no='1', blood_group='A+',
+    )
+
+
+def make_teams(sport, count, players_per_team):
+    start = Team.objects.count()
+    for i in range(start, start + count):
+        coach_user = CustomUser.objects.create_user(f'coach{sport.pk}-{i}@example.com', 'pass12345', is_coach=True)
+        coach = Coach.objects.create(user=coach_user, name=f'Coach {i}', experience_years=3)
+        team = Team.objects.create(name=f'{sport.name} Team {i}', sport=sport, coach=coach)
+        team.players.set([
+            make_player(f'player{sport.pk}-{i}-{j}@example.com', sport) for j in range(players_per_team)
+        ])
+        Achievements.objects.create(team=team, description=f'Champions {i}')
+
+
+@override_settings(STORAGES=TEST_STORAGES, PASSWORD_HASHERS=FAST_HASHERS)
+class TeamsPageQueryCountTests(TestCase):
+    """The teams page must not issue queries per team or per player."""
+
+    # Session, sports, teams, roster, achievements; the user is cached by EmailBackend.
+    QUERIES = 5
+
+    def setUp(self):
+        cache.clear()
+        self.sport = Sport.objects.create(name='Cricket')
+        self.viewer = make_player('viewer@example.com', self.sport)
+        self.client.force_login(self.viewer.user)
+        self.client.get(reverse('static_pages:teams'))
+
+    def test_query_count_is_constant(self):
+        url = reverse('static_pages:teams')
+        make_teams(self.sport, 1, 2)
+        with self.assertNumQueries(self.QUERIES):
+            self.client.get(url)
+
+        make_teams(Sport.objects.create(name='Football'), 5, 6)
+        with self.assertNumQueries(self.QUERIES):
+            response = self.client.get(url)
+        self.assertContains(response, 'Football Team 4')
+
+    def test_sport_filter_query_count_is_constant(self):
+        make_teams(self.sport, 4, 5)
+        with self.assertNumQueries(self.QUERIES):
+            self.client.get(reverse('static_pages:teams'), {'sport': self.sport.pk})
@@ -7,6 +7,9 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("teams/", views.teams, name='teams'),
     path('scoreboard/', views.scoreboard, name='scoreboard'),
+    path('scoreboard/live/', views.scoreboard_live, name='scoreboard_live'),
+    path('scoreboard/stream/', views.scoreboard_stream, name='scoreboard_stream'),
+    path('standings/', views.standings, name='standings'),
     path("about/", views.aboutus, name="aboutus"),
     path('developer-profile/', views.dev_profile, name='dev_profile'),
 ]
\ No newline at end of file
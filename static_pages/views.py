@@ -1,32 +1,121 @@
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
 from .models import Achievements, HomePic, HODMessage
 from sports_base.models import Sport, Team, MatchResult
+from sports_base.models import Standing
+from sports_base.scoreboard import scoreboard_page, scoreboard_queryset
+from sports_base.standings import league_table
+from sports_base.live import feed as live_feed
+from sports_base.conditional import conditional_page
+from sports_base.pagecache import cache_public_page
+from sports_base.querysets import teams_with_roster
 from django.contrib.auth.decorators import login_required
 
+# Seconds between the scoreboard's polls; each poll answers at once from the shared feed
+LIVE_POLL_SECONDS = 5
+LIVE_STREAM_TIMEOUT = 25
+LIVE_STREAM_SECONDS = 300
+
+@conditional_page((MatchResult, 'updated_at'), (Sport, 'updated_at'))
+@cache_public_page(MatchResult, Sport)
 def scoreboard(request):
     sports = Sport.objects.all()
     selected_sport = request.GET.get('sport')
-    if selected_sport:
-        matches = MatchResult.objects.filter(sport__id=selected_sport).order_by('-date')
-    else:
-        matches = MatchResult.objects.all().order_by('-date')
+    if selected_sport and not selected_sport.isdigit():
+        selected_sport = None
+    matches = scoreboard_page(scoreboard_queryset(sport_id=selected_sport), request.GET.get('page'))
 
     context = {
         'sports': sports,
         'matches': matches,
         'selected_sport': selected_sport,
+        'live_use_sse': getattr(settings, 'LIVE_SCORES_USE_SSE', False),
+        'live_poll_seconds': LIVE_POLL_SECONDS,
     }
     return render(request, 'static_pages/scoreboard.html', context)
 
+def _live_cursor(value):
+    return int(value) if value and value.isdigit() else None
+
+def scoreboard_live(request):
+    """Short poll for score changes after ?since=<cursor>; never waits for one."""
+    live_feed.start()
+    cursor, changes = live_feed.changes_since(_live_cursor(request.GET.get('since')))
+    response = JsonResponse({'cursor': cursor, 'matches': changes})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def _sse_event(cursor, changes):
+    return f"id: {cursor}\nevent: scores\ndata: {json.dumps(changes)}\n\n"
+
+async def _sse_events(since):
+    deadline = time.monotonic() + LIVE_STREAM_SECONDS
+    yield "retry: 3000\n\n"
+    while time.monotonic() < deadline:
+        cursor, changes = await sync_to_async(live_feed.wait, thread_sensitive=False)(since, LIVE_STREAM_TIMEOUT)
+        if changes:
+            since = cursor
+            yield _sse_event(cursor, changes)
+        else:
+            yield ": keep-alive\n\n"
+
+def scoreboard_stream(request):
+    """
+    Server-Sent Events stream of score changes, under ASGI only.
+
+    An idle async stream costs no worker. Under WSGI it would hold a worker
+    for the whole stream, so the answer is 204, which tells EventSource not
+    to reconnect; the page then falls back to short polls.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    since = _live_cursor(request.headers.get('Last-Event-ID') or request.GET.get('since'))
+    response = StreamingHttpResponse(_sse_events(since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def standings(request):
+    sports = list(Sport.objects.order_by('name'))
+    selected_sport = request.GET.get('sport')
+    selected_sport = int(selected_sport) if selected_sport and selected_sport.isdigit() else None
+    if selected_sport is None and sports:
+        selected_sport = sports[0].id
+
+    seasons = list(
+        Standing.objects.filter(sport_id=selected_sport).values_list('season', flat=True).distinct().order_by('-season')
+    )
+    selected_season = request.GET.get('season')
+    selected_season = int(selected_season) if selected_season and selected_season.isdigit() else None
+    if selected_season not in seasons:
+        selected_season = seasons[0] if seasons else None
+
+    table = league_table(selected_sport, selected_season) if selected_season else []
+
+    context = {
+        'sports': sports,
+        'seasons': seasons,
+        'selected_sport': selected_sport,
+        'selected_season': selected_season,
+        'table': table,
+    }
+    return render(request, 'static_pages/standings.html', context)
+
 @login_required(login_url='Sports_Users:player_login')
 def teams(request):
     sports = Sport.objects.all()
     selected_sport = request.GET.get('sport')
     
     if selected_sport:
-        teams = Team.objects.filter(sport__id=selected_sport).prefetch_related('players', 'achievements').select_related('coach', 'sport')
+        teams = teams_with_roster(Team.objects.filter(sport__id=selected_sport))
     else:
-        teams = Team.objects.prefetch_related('players', 'achievements').select_related('coach', 'sport')
+        teams = teams_with_roster()
     
     context = {
         'teams': teams,
@@ -35,6 +124,7 @@ def teams(request):
     }
     return render(request, 'static_pages/teams.html', context)
 
+@cache_public_page(HomePic, HODMessage, vary_on=())
 def home(request):
     home_pic = HomePic.objects.all()
     hod_message = HODMessage.objects.first() if HODMessage.objects.exists() else None